@@ -7,12 +7,15 @@ from typing import Any, Dict, List
 
 from openai import OpenAI
 
+from src.validate_content_quality import scan_text
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
 
 MAX_PREVIOUS_WEEKS = 3
 MAX_SECTION_CHARS = 2200
+DEFAULT_GUARDRAIL_RETRIES = 2
 
 
 TREND_KEYWORDS = {
@@ -484,6 +487,34 @@ Important:
 """
 
 
+def get_guardrail_retries() -> int:
+    value = os.getenv("AI_GUARDRAIL_RETRIES", "").strip()
+
+    if not value:
+        return DEFAULT_GUARDRAIL_RETRIES
+
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return DEFAULT_GUARDRAIL_RETRIES
+
+
+def build_guardrail_feedback(findings: List[tuple[str, str]]) -> str:
+    categories = sorted({category for category, _ in findings})
+    patterns = sorted({pattern for _, pattern in findings})
+
+    return f"""
+Your previous draft was rejected by the content quality guardrails.
+
+Rejected categories: {", ".join(categories)}
+Matched patterns: {", ".join(patterns)}
+
+Rewrite the full section from scratch.
+Do not use any wording that matches the rejected patterns.
+Keep the same structure and company context.
+"""
+
+
 def generate_ai_content(
     client: Dict[str, Any],
     content_type: str,
@@ -495,30 +526,60 @@ def generate_ai_content(
     try:
         api_key = os.getenv("OPENAI_API_KEY", "").strip()
         model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+        max_retries = get_guardrail_retries()
 
         client_api = OpenAI(api_key=api_key)
 
-        response = client_api.chat.completions.create(
-            model=model,
-            messages=[
+        messages = [
+            {
+                "role": "system",
+                "content": build_system_prompt(content_type),
+            },
+            {
+                "role": "user",
+                "content": build_prompt(client, content_type),
+            },
+        ]
+
+        for attempt in range(max_retries + 1):
+            response = client_api.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7,
+            )
+
+            text = response.choices[0].message.content
+
+            if not text or not text.strip():
+                return fallback_text
+
+            text = text.strip()
+            findings = scan_text(text)
+
+            if not findings:
+                return text
+
+            print(
+                f"AI content for {content_type} failed guardrails "
+                f"(attempt {attempt + 1}/{max_retries + 1}): "
+                f"{', '.join(sorted({category for category, _ in findings}))}"
+            )
+
+            # Only this section is regenerated; the rejected draft stays in the
+            # conversation so the model can see what to avoid.
+            messages = messages[:2] + [
                 {
-                    "role": "system",
-                    "content": build_system_prompt(content_type),
+                    "role": "assistant",
+                    "content": text,
                 },
                 {
                     "role": "user",
-                    "content": build_prompt(client, content_type),
+                    "content": build_guardrail_feedback(findings),
                 },
-            ],
-            temperature=0.7,
-        )
-
-        text = response.choices[0].message.content
+            ]
 
-        if not text or not text.strip():
-            return fallback_text
-
-        return text.strip()
+        print(f"AI content for {content_type} kept failing guardrails; using fallback")
+        return fallback_text
 
     except Exception as e:
         print(f"AI content generation failed for {content_type}: {e}")
@@ -0,0 +1,196 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.drive_stand_in import FOLDER_MIME_TYPE, DriveStandIn, start_server
+
+
+DEFAULT_WORKERS = "1,2,4,8"
+
+
+def build_service_account_json(token_uri: str) -> str:
+    """A throwaway service account whose token endpoint is the stand-in."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("utf-8")
+
+    return json.dumps(
+        {
+            "type": "service_account",
+            "project_id": "drive-stand-in",
+            "private_key_id": "stand-in",
+            "private_key": private_key,
+            "client_email": "benchmark@drive-stand-in.iam.gserviceaccount.com",
+            "token_uri": token_uri,
+        }
+    )
+
+
+def build_week_dir(base_dir: Path, client_count: int, file_mb: float) -> Path:
+    week_dir = base_dir / "2026-W01"
+    size = int(file_mb * 1024 * 1024)
+
+    for index in range(client_count):
+        client_dir = week_dir / f"client_{index:03d}"
+        client_dir.mkdir(parents=True)
+        (client_dir / "package.zip").write_bytes(os.urandom(size))
+        (client_dir / "full_pack.pdf").write_bytes(os.urandom(size // 2))
+        (client_dir / "full_pack.md").write_text("# Weekly pack\n" * 2000, encoding="utf-8")
+
+    return week_dir
+
+
+def build_clients(week_dir: Path) -> List[Dict[str, Any]]:
+    return [
+        {
+            "client_id": client_dir.name,
+            "package_zip": f"{client_dir.name}/package.zip",
+            "pdf": f"{client_dir.name}/full_pack.pdf",
+            "markdown": f"{client_dir.name}/full_pack.md",
+            "delivery_status": "ready_for_upload",
+        }
+        for client_dir in sorted(p for p in week_dir.iterdir() if p.is_dir())
+    ]
+
+
+def run_pass(
+    drive: DriveStandIn,
+    clients: List[Dict[str, Any]],
+    week_dir: Path,
+    root_folder_id: str,
+    folder_cache: Dict[str, str],
+    workers: int,
+) -> Dict[str, Any]:
+    from src.upload_drive_artifacts import upload_clients
+
+    for client in clients:
+        client["delivery_status"] = "ready_for_upload"
+
+    before = drive.snapshot_stats()
+    started = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        upload_clients(
+            clients,
+            week_dir,
+            True,
+            root_drive_folder_id=root_folder_id,
+            folder_cache=folder_cache,
+            workers=workers,
+        )
+
+    seconds = time.perf_counter() - started
+    after = drive.snapshot_stats()
+    stats = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+
+    failed = {
+        client["client_id"]: client.get("error")
+        for client in clients
+        if client["delivery_status"] != "uploaded"
+    }
+    uploaded_mb = stats.get("uploaded_bytes", 0) / (1024 * 1024)
+
+    return {
+        "workers": workers,
+        "clients": len(clients),
+        "seconds": round(seconds, 3),
+        "round_trips": stats.get("round_trips", 0),
+        "round_trips_per_client": round(stats.get("round_trips", 0) / max(1, len(clients)), 2),
+        "batched_calls": stats.get("batched_calls", 0),
+        "quota_errors": stats.get("quota_errors", 0),
+        "uploaded_mb": round(uploaded_mb, 2),
+        "mb_per_second": round(uploaded_mb / seconds, 2) if seconds else 0.0,
+        "failed_clients": failed,
+        "calls": {
+            key: value
+            for key, value in sorted(stats.items())
+            if key not in ("round_trips", "batched_calls", "quota_errors", "uploaded_bytes", "token_requests")
+        },
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'pass':<8}{'workers':>8}{'seconds':>10}{'trips':>8}{'trips/client':>14}"
+        f"{'batched':>9}{'429s':>6}{'MB':>9}{'MB/s':>9}{'failed':>8}"
+    )
+
+    for result in results:
+        print(
+            f"{result['pass']:<8}{result['workers']:>8}{result['seconds']:>10}"
+            f"{result['round_trips']:>8}{result['round_trips_per_client']:>14}"
+            f"{result['batched_calls']:>9}{result['quota_errors']:>6}"
+            f"{result['uploaded_mb']:>9}{result['mb_per_second']:>9}{len(result['failed_clients']):>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark upload_drive_artifacts against a local Drive v3 stand-in."
+    )
+    parser.add_argument("--clients", type=int, default=12)
+    parser.add_argument("--workers", default=DEFAULT_WORKERS, help="Comma-separated worker counts to compare.")
+    parser.add_argument("--file-mb", type=float, default=2.0, help="Size of each client's zip; the PDF is half of it.")
+    parser.add_argument("--chunk-mb", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="", help="Optional path for the JSON results.")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="drive_benchmark_"))
+    drive = DriveStandIn(
+        work_dir / "drive",
+        latency_ms=args.latency_ms,
+        quota_error_rate=args.quota_error_rate,
+        seed=args.seed,
+    )
+    server = start_server(drive)
+
+    os.environ["GOOGLE_API_ENDPOINT"] = drive.base_url
+    os.environ["GOOGLE_SERVICE_ACCOUNT_JSON"] = build_service_account_json(f"{drive.base_url}/token")
+    os.environ["DRIVE_UPLOAD_CHUNK_MB"] = str(args.chunk_mb)
+
+    week_dir = build_week_dir(work_dir / "output", args.clients, args.file_mb)
+    results: List[Dict[str, Any]] = []
+
+    print(f"Drive stand-in: {drive.base_url} latency={args.latency_ms}ms quota_error_rate={args.quota_error_rate}")
+    print(f"Clients: {args.clients}, zip={args.file_mb} MB, chunk={args.chunk_mb} MB")
+
+    try:
+        for workers in [int(value) for value in args.workers.split(",") if value.strip()]:
+            drive.reset()
+            root = drive.create_file({"name": "root", "mimeType": FOLDER_MIME_TYPE})
+            clients = build_clients(week_dir)
+            folder_cache: Dict[str, str] = {}
+
+            # First pass uploads everything; the rerun should only list
+            # folders and skip files whose md5 already matches.
+            for pass_name in ("first", "rerun"):
+                result = run_pass(drive, clients, week_dir, root["id"], folder_cache, workers)
+                result["pass"] = pass_name
+                results.append(result)
+    finally:
+        server.shutdown()
+
+    print_results(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote benchmark results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
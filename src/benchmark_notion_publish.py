@@ -0,0 +1,171 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src import notion_http, notion_schema
+from src.notion_stand_in import NotionStandIn, start_server
+
+
+DEFAULT_WORKERS = "1,4,8"
+WEEK = "2026-W01"
+
+
+def build_clients(client_count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "client_id": f"client_{index:03d}",
+            "company_name": f"Client {index:03d} Freight",
+            "delivery_status": "uploaded",
+            "drive_pdf_url": f"https://drive.example/{index}/pack.pdf",
+            "drive_zip_url": f"https://drive.example/{index}/pack.zip",
+            "drive_markdown_url": f"https://drive.example/{index}/pack.md",
+            "drive_client_folder_id": f"folder{index}",
+        }
+        for index in range(client_count)
+    ]
+
+
+def run_pass(
+    notion: NotionStandIn,
+    clients: List[Dict[str, Any]],
+    workers: int,
+    client_rate: float,
+) -> Dict[str, Any]:
+    from src.publish_to_notion import build_page_index, publish_clients
+
+    api_key = "stand-in-key"
+
+    for client in clients:
+        client["delivery_status"] = "uploaded"
+
+    # A fresh bucket per pass; 0 turns the client-side limiter off.
+    notion_http.RATE_LIMITER = notion_http.TokenBucket(client_rate or 1_000_000.0, 1.0)
+
+    before = notion.snapshot_stats()
+    started = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        page_index = build_page_index(api_key, notion.database_id, WEEK)
+        publish_clients(
+            clients,
+            WEEK,
+            True,
+            api_key=api_key,
+            database_id=notion.database_id,
+            workers=workers,
+            page_index=page_index,
+        )
+
+    seconds = time.perf_counter() - started
+    after = notion.snapshot_stats()
+    stats = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+
+    failed = {
+        client["client_id"]: client.get("error")
+        for client in clients
+        if client["delivery_status"] != "published"
+    }
+    requests_sent = stats.get("requests", 0)
+    accepted = requests_sent - stats.get("rate_limited", 0)
+
+    return {
+        "workers": workers,
+        "client_rate": client_rate,
+        "clients": len(clients),
+        "seconds": round(seconds, 3),
+        "requests": requests_sent,
+        "rate_limited": stats.get("rate_limited", 0),
+        "accepted_per_second": round(accepted / seconds, 2) if seconds else 0.0,
+        "clients_per_second": round((len(clients) - len(failed)) / seconds, 2) if seconds else 0.0,
+        "failed_clients": failed,
+        "calls": {
+            key: value
+            for key, value in sorted(stats.items())
+            if key not in ("requests", "rate_limited")
+        },
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'pass':<8}{'workers':>8}{'limit/s':>9}{'seconds':>10}{'requests':>10}"
+        f"{'429s':>6}{'ok req/s':>10}{'clients/s':>11}{'failed':>8}"
+    )
+
+    for result in results:
+        print(
+            f"{result['pass']:<8}{result['workers']:>8}{result['client_rate'] or 'off':>9}"
+            f"{result['seconds']:>10}{result['requests']:>10}{result['rate_limited']:>6}"
+            f"{result['accepted_per_second']:>10}{result['clients_per_second']:>11}"
+            f"{len(result['failed_clients']):>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark publish_to_notion against a local Notion API stand-in."
+    )
+    parser.add_argument("--clients", type=int, default=30)
+    parser.add_argument("--workers", default=DEFAULT_WORKERS, help="Comma-separated worker counts to compare.")
+    parser.add_argument(
+        "--client-rates",
+        default="3,0",
+        help="Comma-separated client-side limits in requests/s to compare; 0 disables the limiter.",
+    )
+    parser.add_argument("--server-rate", type=float, default=3.0)
+    parser.add_argument("--server-burst", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--output", default="", help="Optional path for the JSON results.")
+    args = parser.parse_args()
+
+    notion = NotionStandIn(
+        rate_limit=args.server_rate,
+        burst=args.server_burst,
+        latency_ms=args.latency_ms,
+    )
+    server = start_server(notion)
+    os.environ["NOTION_API_URL"] = f"{notion.base_url}/v1"
+
+    # Keep the stand-in's schema out of the real cache under output/.
+    cache_dir = tempfile.TemporaryDirectory()
+    notion_schema.SCHEMA_CACHE_PATH = Path(cache_dir.name) / "notion_schema_cache.json"
+
+    print(
+        f"Notion stand-in: {notion.base_url} rate={args.server_rate}/s "
+        f"burst={args.server_burst} latency={args.latency_ms}ms"
+    )
+    print(f"Clients: {args.clients}")
+
+    results: List[Dict[str, Any]] = []
+
+    try:
+        for client_rate in [float(value) for value in args.client_rates.split(",") if value.strip()]:
+            for workers in [int(value) for value in args.workers.split(",") if value.strip()]:
+                notion.reset()
+                clients = build_clients(args.clients)
+
+                # First pass creates every page; the rerun finds them in the
+                # page index and updates them in place.
+                for pass_name in ("first", "rerun"):
+                    result = run_pass(notion, clients, workers, client_rate)
+                    result["pass"] = pass_name
+                    results.append(result)
+    finally:
+        server.shutdown()
+        cache_dir.cleanup()
+
+    print_results(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote benchmark results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
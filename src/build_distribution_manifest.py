@@ -4,6 +4,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List
 
+from src import manifest_store
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
@@ -48,6 +50,8 @@ def build_distribution_manifest(master_index: Dict[str, Any]) -> Dict[str, Any]:
                 "client_id": client.get("client_id"),
                 "company_name": client.get("company_name"),
                 "package_zip": client.get("package_zip"),
+                "package_sha256": client.get("package_sha256"),
+                "package_status": client.get("package_status"),
                 "client_folder": client.get("client_folder"),
                 "pdf": client.get("pdf"),
                 "markdown": client.get("markdown"),
@@ -79,11 +83,7 @@ def main() -> None:
 
     distribution_manifest = build_distribution_manifest(master_index)
 
-    output_path = week_dir / "distribution_manifest.json"
-    output_path.write_text(
-        json.dumps(distribution_manifest, indent=2),
-        encoding="utf-8",
-    )
+    output_path = manifest_store.replace_manifest(week_dir, distribution_manifest)
 
     print(f"Wrote distribution manifest: {output_path}")
 
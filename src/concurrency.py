@@ -0,0 +1,27 @@
+import os
+from typing import Optional
+
+
+def worker_limit(env_var: str, default: Optional[int] = None) -> int:
+    """
+    The worker count set in env_var. Unset or unparsable values fall back
+    to default, or to the CPU count when default is None; anything below
+    one becomes one.
+    """
+    value = os.getenv(env_var, "").strip()
+
+    try:
+        workers = int(value) if value else None
+    except ValueError:
+        print(f"Ignoring invalid {env_var}={value!r}")
+        workers = None
+
+    if workers is None:
+        workers = default if default is not None else os.cpu_count() or 1
+
+    return max(1, workers)
+
+
+def worker_count(env_var: str, default: Optional[int], n: int) -> int:
+    """worker_limit for a run over n items: never more workers than items."""
+    return max(1, min(worker_limit(env_var, default), n))
@@ -0,0 +1,383 @@
+import json
+from enum import StrEnum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class DeliveryStatus(StrEnum):
+    READY_FOR_UPLOAD = "ready_for_upload"
+    UPLOADED = "uploaded"
+    UPLOAD_FAILED = "upload_failed"
+    PUBLISHED = "published"
+    PUBLISH_FAILED = "publish_failed"
+    NOTIFIED = "notified"
+    NOTIFY_FAILED = "notify_failed"
+    RETRY_PENDING = "retry_pending"
+    RETRYING = "retrying"
+    CONFIRMED = "confirmed"
+
+
+# Forward moves made by the pipeline stages, plus the operator resets that
+# send a failed client back to the stage that failed.
+ALLOWED_TRANSITIONS: Dict[DeliveryStatus, Tuple[DeliveryStatus, ...]] = {
+    DeliveryStatus.READY_FOR_UPLOAD: (
+        DeliveryStatus.UPLOADED,
+        DeliveryStatus.UPLOAD_FAILED,
+    ),
+    DeliveryStatus.UPLOAD_FAILED: (
+        DeliveryStatus.UPLOADED,
+    ),
+    DeliveryStatus.UPLOADED: (
+        DeliveryStatus.PUBLISHED,
+        DeliveryStatus.PUBLISH_FAILED,
+    ),
+    DeliveryStatus.PUBLISH_FAILED: (
+        DeliveryStatus.UPLOADED,
+        DeliveryStatus.PUBLISHED,
+    ),
+    DeliveryStatus.PUBLISHED: (
+        DeliveryStatus.NOTIFIED,
+        DeliveryStatus.NOTIFY_FAILED,
+    ),
+    DeliveryStatus.NOTIFY_FAILED: (
+        DeliveryStatus.PUBLISHED,
+        DeliveryStatus.NOTIFIED,
+    ),
+    DeliveryStatus.NOTIFIED: (
+        DeliveryStatus.NOTIFY_FAILED,
+        DeliveryStatus.RETRY_PENDING,
+        DeliveryStatus.CONFIRMED,
+    ),
+    DeliveryStatus.RETRY_PENDING: (
+        DeliveryStatus.RETRYING,
+        DeliveryStatus.CONFIRMED,
+    ),
+    DeliveryStatus.RETRYING: (
+        DeliveryStatus.RETRY_PENDING,
+        DeliveryStatus.CONFIRMED,
+    ),
+    DeliveryStatus.CONFIRMED: (
+        DeliveryStatus.NOTIFY_FAILED,
+    ),
+}
+
+
+# Field name -> value type. Every field is optional and may be None.
+# Fields not listed here are kept in the record's extras.
+FIELD_SCHEMA: Dict[str, type] = {
+    "client_id": str,
+    "company_name": str,
+    "package_zip": str,
+    "package_sha256": str,
+    "package_status": str,
+    "client_folder": str,
+    "pdf": str,
+    "markdown": str,
+    "meta": str,
+    "drive_zip_url": str,
+    "drive_pdf_url": str,
+    "drive_markdown_url": str,
+    "notion_url": str,
+    "webhook_sent": bool,
+    "email_sent": bool,
+    "delivery_status": DeliveryStatus,
+    "error": str,
+    "drive_upload_mode": str,
+    "uploaded_at": str,
+    "upload_failed_at": str,
+    "drive_zip_file_id": str,
+    "drive_pdf_file_id": str,
+    "drive_markdown_file_id": str,
+    "drive_zip_md5": str,
+    "drive_pdf_md5": str,
+    "drive_markdown_md5": str,
+    "drive_week_folder_id": str,
+    "drive_client_folder_id": str,
+    "notion_page_id": str,
+    "notion_publish_mode": str,
+    "notion_publish_action": str,
+    "published_at": str,
+    "publish_failed_at": str,
+    "webhook_mode": str,
+    "webhook_sent_at": str,
+    "webhook_status_code": int,
+    "webhook_response_preview": str,
+    "webhook_payload_sha256": str,
+    "webhook_batch_id": str,
+    "email_mode": str,
+    "email_checked_at": str,
+    "email_status": str,
+    "email_error": str,
+    "email_sent_at": str,
+    "email_recipients": list,
+    "retry_count": int,
+    "retry_after": str,
+    "last_error": str,
+    "last_retry_checked_at": str,
+    "retry_started_at": str,
+    "retry_resolved_at": str,
+    "confirmed_at": str,
+    "queue_attempts": int,
+    "queue_started_at": str,
+    "queue_resolved_at": str,
+    "queue_next_attempt_at": str,
+    "queue_last_error": str,
+}
+
+FIELD_NAMES: Tuple[str, ...] = tuple(FIELD_SCHEMA)
+
+# Marks a field that was not set before (or after) a change.
+MISSING: Any = object()
+
+
+class InvalidStatusTransition(ValueError):
+    pass
+
+
+def parse_field_value(field: str, raw: str) -> Any:
+    """
+    Convert a command-line string into the schema type for field. Unknown
+    fields are kept as strings, and so is "null" for a text field: clearing
+    a field takes an explicit None.
+    """
+    if field not in FIELD_SCHEMA:
+        return raw
+
+    value_type = FIELD_SCHEMA[field]
+    text = raw.strip()
+
+    if value_type is bool:
+        lowered = text.lower()
+        if lowered in ("true", "1", "yes"):
+            return True
+        if lowered in ("false", "0", "no"):
+            return False
+        raise ValueError(f"Invalid boolean for {field}: {raw}")
+
+    if value_type is int:
+        return int(text)
+
+    if value_type is list:
+        if text.startswith("["):
+            return json.loads(text)
+        return [item.strip() for item in text.split(",") if item.strip()]
+
+    if value_type is DeliveryStatus:
+        return DeliveryStatus(text)
+
+    return raw
+
+
+def coerce_field_value(field: str, value: Any) -> Any:
+    value_type = FIELD_SCHEMA.get(field)
+
+    if value_type is None or value is None:
+        return value
+
+    if value_type is DeliveryStatus:
+        return DeliveryStatus(value)
+
+    if isinstance(value, value_type):
+        return value
+
+    if value_type is int and isinstance(value, str):
+        return int(value)
+
+    if value_type is bool and isinstance(value, str):
+        return parse_field_value(field, value)
+
+    raise TypeError(
+        f"Invalid type for {field}: expected {value_type.__name__}, got {type(value).__name__}"
+    )
+
+
+def check_transition(current: Optional[DeliveryStatus], new: Optional[DeliveryStatus]) -> None:
+    if current is None or new is None or current == new:
+        return
+
+    # Any client can be sent back to the start of the pipeline.
+    if new == DeliveryStatus.READY_FOR_UPLOAD:
+        return
+
+    if new not in ALLOWED_TRANSITIONS.get(current, ()):
+        raise InvalidStatusTransition(
+            f"Invalid delivery_status transition: {current} -> {new}"
+        )
+
+
+class ClientDeliveryRecord:
+    """
+    One client's delivery state in the distribution manifest.
+
+    Known fields live in slots and are type-checked against FIELD_SCHEMA
+    when written; delivery_status changes must follow ALLOWED_TRANSITIONS.
+    Loading is lenient: a stored value of the wrong type, or an unknown
+    status, is kept as-is with a warning. The record supports dict-style
+    access so stage code can keep using client["field"] and client.get(...).
+    Changed fields are tracked until mark_clean().
+    """
+
+    __slots__ = FIELD_NAMES + ("extras", "position", "version", "changed_fields")
+
+    def __init__(self, position: Optional[int] = None) -> None:
+        self.extras: Optional[Dict[str, Any]] = None
+        self.position = position
+        self.version = 0
+        self.changed_fields: Dict[str, Tuple[Any, Any]] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], position: Optional[int] = None) -> "ClientDeliveryRecord":
+        record = cls(position=position)
+
+        for key, value in data.items():
+            try:
+                value = coerce_field_value(key, value)
+            except (TypeError, ValueError) as e:
+                print(f"Warning: client {data.get('client_id')}: keeping stored {key}={value!r} as-is: {e}")
+
+            record._store(key, value)
+
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+
+        for name in FIELD_NAMES:
+            value = self._load(name)
+            if value is not MISSING:
+                data[name] = value
+
+        if self.extras:
+            data.update(self.extras)
+
+        return data
+
+    def _load(self, key: str) -> Any:
+        if key in FIELD_SCHEMA:
+            return getattr(self, key, MISSING)
+
+        if self.extras is None:
+            return MISSING
+
+        return self.extras.get(key, MISSING)
+
+    def _store(self, key: str, value: Any) -> None:
+        if key in FIELD_SCHEMA:
+            if value is MISSING:
+                if hasattr(self, key):
+                    delattr(self, key)
+            else:
+                setattr(self, key, value)
+            return
+
+        if value is MISSING:
+            if self.extras is not None:
+                self.extras.pop(key, None)
+            return
+
+        if self.extras is None:
+            self.extras = {}
+
+        self.extras[key] = value
+
+    def _record(self, key: str, old: Any, new: Any) -> None:
+        original = self.changed_fields[key][0] if key in self.changed_fields else old
+
+        if original is MISSING and new is MISSING:
+            self.changed_fields.pop(key, None)
+        elif original is not MISSING and new is not MISSING and original == new:
+            self.changed_fields.pop(key, None)
+        else:
+            self.changed_fields[key] = (original, new)
+
+        self.version += 1
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._load(key)
+
+        if value is MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        value = coerce_field_value(key, value)
+        old = self._load(key)
+
+        if key == "delivery_status":
+            check_transition(None if old is MISSING else old, value)
+
+        self._store(key, value)
+
+        if old is MISSING or old != value:
+            self._record(key, old, value)
+
+    def __delitem__(self, key: str) -> None:
+        old = self[key]
+        self._store(key, MISSING)
+        self._record(key, old, MISSING)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._load(key) is not MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ClientDeliveryRecord):
+            return self.to_dict() == other.to_dict()
+
+        if isinstance(other, dict):
+            return self.to_dict() == other
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ClientDeliveryRecord({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._load(key)
+        return default if value is MISSING else value
+
+    def keys(self) -> List[str]:
+        return list(self.to_dict())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return list(self.to_dict().items())
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+
+        value = self[key]
+        del self[key]
+        return value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+
+        return self[key]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self.changed_fields)
+
+    def mark_clean(self) -> None:
+        self.changed_fields = {}
+
+
+def record_to_json(value: Any) -> Any:
+    """json.dumps default hook for manifests holding ClientDeliveryRecord objects."""
+    if isinstance(value, ClientDeliveryRecord):
+        return value.to_dict()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
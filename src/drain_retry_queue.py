@@ -0,0 +1,278 @@
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import manifest_store, retry_queue
+from src import publish_to_notion, send_email_notifications, send_webhook_notifications
+from src.retry_queue import OUTPUT_DIR
+
+
+# A retried delivery that succeeds unblocks the next stage for its client.
+FOLLOW_UPS = {"notion": "webhook"}
+
+# Statuses a client can hold once its Notion page exists.
+PUBLISHED_STATUSES = ("published", "notified", "notify_failed", "retry_pending", "retrying", "confirmed")
+
+# (ok, status_code, error) for one retried delivery.
+Result = Tuple[bool, Optional[int], Optional[str]]
+
+
+class MissingConfiguration(RuntimeError):
+    """The stage a retry needs has no credentials; retrying cannot help."""
+
+
+def webhook_configured() -> bool:
+    return bool(os.getenv("WEBHOOK_URL", "").strip())
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class WeekContext:
+    """The manifest and lazily built Notion page index for one week."""
+
+    def __init__(self, week: str) -> None:
+        self.week = week
+        self.week_dir = OUTPUT_DIR / week
+        self.manifest = manifest_store.load_manifest(self.week_dir)
+        self.clients = {
+            client.get("client_id"): client
+            for client in self.manifest.get("clients", [])
+        }
+        self.page_index: Optional[publish_to_notion.PageIndex] = None
+
+
+def retry_notion(context: WeekContext, client: Dict[str, Any]) -> Result:
+    if not publish_to_notion.has_notion_secrets():
+        raise MissingConfiguration("Notion credentials missing")
+
+    if client.get("delivery_status") not in ("publish_failed", "uploaded"):
+        return True, None, None
+
+    api_key = os.getenv("NOTION_API_KEY", "").strip()
+    database_id = os.getenv("NOTION_DATABASE_ID", "").strip()
+
+    # One query per week, so a retry updates the page a partial first
+    # attempt may have created instead of adding a duplicate.
+    if context.page_index is None:
+        context.page_index = publish_to_notion.build_page_index(api_key, database_id, context.week)
+
+    client["delivery_status"] = "uploaded"
+    publish_to_notion.process_client(client, context.week, True, api_key, database_id, context.page_index)
+
+    if client.get("delivery_status") == "published":
+        return True, None, None
+
+    return False, None, client.get("error")
+
+
+def retry_webhook(context: WeekContext, client: Dict[str, Any]) -> Result:
+    webhook_url = os.getenv("WEBHOOK_URL", "").strip()
+
+    if not webhook_url:
+        raise MissingConfiguration("WEBHOOK_URL missing")
+
+    if client.get("delivery_status") not in ("notify_failed", "published"):
+        return True, None, None
+
+    client["delivery_status"] = "published"
+    send_webhook_notifications.process_client(client, context.week, webhook_url)
+
+    if client.get("delivery_status") == "notified":
+        return True, client.get("webhook_status_code"), None
+
+    return False, client.get("webhook_status_code"), client.get("error")
+
+
+def retry_email(context: WeekContext, client: Dict[str, Any]) -> Result:
+    if not send_email_notifications.smtp_config_available():
+        raise MissingConfiguration("SMTP credentials missing")
+
+    if client.get("email_status") == "sent":
+        return True, None, None
+
+    if send_email_notifications.process_client(client, context.week, "real"):
+        return True, None, None
+
+    return False, None, client.get("email_error")
+
+
+HANDLERS = {
+    "notion": retry_notion,
+    "webhook": retry_webhook,
+    "email": retry_email,
+}
+
+# Follow-ups are only queued for stages that run for real; in mock mode
+# there is nothing to deliver.
+CONFIGURED = {
+    "webhook": webhook_configured,
+}
+
+
+def record_client_retry(client: Dict[str, Any], ok: bool, error: Optional[str], item: Optional[Dict[str, Any]]) -> None:
+    # queue_* fields, so the simulated retry flow's retry_* fields are left alone.
+    client["queue_attempts"] = int(client.get("queue_attempts", 0) or 0) + 1
+    client["queue_started_at"] = client.get("queue_started_at") or now_iso()
+
+    if ok:
+        client["queue_resolved_at"] = now_iso()
+        client["queue_next_attempt_at"] = None
+        client["queue_last_error"] = None
+        return
+
+    client["queue_last_error"] = error
+    client["queue_next_attempt_at"] = item.get("next_attempt_at") if item else None
+
+
+def refresh_stage_counts(manifest: Dict[str, Any]) -> None:
+    """
+    Recount the Notion and webhook stage totals from the client records, as
+    those stages count them, so clients recovered here stop counting as
+    failed. A published client may since have moved on to the webhook.
+    """
+    clients = manifest.get("clients", [])
+
+    if "notion_published_client_count" in manifest:
+        manifest["notion_published_client_count"] = sum(
+            client.get("delivery_status") in PUBLISHED_STATUSES for client in clients
+        )
+        manifest["notion_publish_failed_client_count"] = sum(
+            client.get("delivery_status") == "publish_failed" for client in clients
+        )
+
+    if "webhook_sent_client_count" in manifest:
+        manifest["webhook_sent_client_count"] = sum(bool(client.get("webhook_sent")) for client in clients)
+        manifest["webhook_failed_client_count"] = sum(
+            client.get("delivery_status") == "notify_failed" for client in clients
+        )
+
+
+def drain_week(week: str, items: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts = {"resolved": 0, "failed": 0}
+    week_dir = OUTPUT_DIR / week
+
+    if not manifest_store.manifest_json_path(week_dir).exists():
+        with retry_queue.transaction() as conn:
+            for item in items:
+                retry_queue.record_failure(conn, item["kind"], week, item["client_id"], f"No manifest for {week}", 404)
+        counts["failed"] = len(items)
+        return counts
+
+    context = WeekContext(week)
+    pending = sorted(items, key=lambda item: retry_queue.KINDS.index(item["kind"]))
+    seen = {(item["kind"], item["client_id"]) for item in pending}
+
+    for item in pending:
+        kind = item["kind"]
+        client_id = item["client_id"]
+        client = context.clients.get(client_id)
+
+        error_class: Optional[str] = None
+
+        if client is None:
+            ok, status_code, error = False, 404, f"Client {client_id} not in manifest"
+        else:
+            try:
+                ok, status_code, error = HANDLERS[kind](context, client)
+            except MissingConfiguration as e:
+                ok, status_code, error = False, None, str(e)
+                error_class = retry_queue.PERMANENT
+            except Exception as e:
+                ok, status_code, error = False, None, str(e)
+
+        with retry_queue.transaction() as conn:
+            if ok:
+                retry_queue.resolve(conn, kind, week, client_id)
+                queued = None
+
+                follow_up = FOLLOW_UPS.get(kind)
+                if follow_up and (follow_up, client_id) not in seen and CONFIGURED[follow_up]():
+                    retry_queue.schedule_now(conn, follow_up, week, client_id, f"After {kind} retry")
+                    seen.add((follow_up, client_id))
+
+                    # A follow-up already given up on stays for an operator.
+                    follow_up_item = retry_queue.get_item(conn, follow_up, week, client_id)
+                    if follow_up_item and follow_up_item["status"] == retry_queue.PENDING:
+                        pending.append(follow_up_item)
+            else:
+                queued = retry_queue.record_failure(conn, kind, week, client_id, error, status_code, error_class)
+
+        if client is not None:
+            record_client_retry(client, ok, error, queued)
+
+        counts["resolved" if ok else "failed"] += 1
+        state = "resolved" if ok else f"failed ({queued['error_class']}, attempt {queued['attempts']})"
+        print(f"Retry {kind} for {client_id}: {state}")
+
+    refresh_stage_counts(context.manifest)
+    context.manifest["retry_queue_drained_at"] = now_iso()
+    context.manifest["retry_queue_resolved_count"] = (
+        int(context.manifest.get("retry_queue_resolved_count", 0) or 0) + counts["resolved"]
+    )
+    manifest_path = manifest_store.save_manifest(week_dir, context.manifest, stage="retry_queue")
+    print(f"Saved manifest: {manifest_path}")
+
+    return counts
+
+
+def drain_due() -> Dict[str, int]:
+    with retry_queue.transaction() as conn:
+        items = retry_queue.due_items(conn)
+
+    totals = {"resolved": 0, "failed": 0}
+    by_week: Dict[str, List[Dict[str, Any]]] = {}
+
+    for item in items:
+        by_week.setdefault(item["week"], []).append(item)
+
+    for week, week_items in sorted(by_week.items()):
+        counts = drain_week(week, week_items)
+        totals["resolved"] += counts["resolved"]
+        totals["failed"] += counts["failed"]
+
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Retry queued webhook, Notion and email deliveries that are due.")
+    parser.add_argument(
+        "--max-wait-seconds",
+        type=float,
+        default=0.0,
+        help="Keep draining retries that fall due within this many seconds instead of exiting after one pass.",
+    )
+    args = parser.parse_args()
+
+    deadline = time.monotonic() + args.max_wait_seconds
+    totals = {"resolved": 0, "failed": 0}
+
+    while True:
+        counts = drain_due()
+        totals["resolved"] += counts["resolved"]
+        totals["failed"] += counts["failed"]
+
+        with retry_queue.transaction() as conn:
+            next_due = retry_queue.next_due_at(conn)
+            remaining = retry_queue.count_items(conn)
+
+        if next_due is None:
+            break
+
+        wait = (next_due - datetime.now(timezone.utc)).total_seconds()
+        if time.monotonic() + wait > deadline:
+            print(f"Next retry due at {next_due.isoformat()}")
+            break
+
+        time.sleep(max(0.0, wait))
+
+    print(f"Retries resolved: {totals['resolved']}")
+    print(f"Retries failed: {totals['failed']}")
+    print(f"Retry queue: {remaining.get(retry_queue.PENDING, 0)} pending, {remaining.get(retry_queue.DEAD, 0)} not retryable")
+
+
+if __name__ == "__main__":
+    main()
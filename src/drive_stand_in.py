@@ -0,0 +1,511 @@
+import argparse
+import email
+import hashlib
+import json
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+# Drive accepts at most 100 calls in one batch request.
+BATCH_LIMIT = 100
+
+# One clause of the Drive query language subset the pipeline sends:
+# name/mimeType comparisons, 'id' in parents and trashed = false.
+QUERY_CLAUSE_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<field>name|mimeType)\s*(?P<op>!=|=)\s*'(?P<value>(?:[^'\\]|\\.)*)'"
+    r"|'(?P<parent>(?:[^'\\]|\\.)*)'\s+in\s+parents"
+    r"|trashed\s*=\s*(?P<trashed>true|false)"
+    r")\s*(?:and\b|$)"
+)
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def unescape_query_value(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def parse_query(query: str) -> List[Tuple[str, str, str]]:
+    clauses: List[Tuple[str, str, str]] = []
+    position = 0
+
+    while position < len(query.strip()):
+        match = QUERY_CLAUSE_RE.match(query, position)
+        if not match:
+            raise ValueError(f"Unsupported Drive query: {query}")
+
+        if match.group("field"):
+            clauses.append((match.group("field"), match.group("op"), unescape_query_value(match.group("value"))))
+        elif match.group("parent") is not None:
+            clauses.append(("parents", "in", unescape_query_value(match.group("parent"))))
+        else:
+            clauses.append(("trashed", "=", match.group("trashed")))
+
+        position = match.end()
+
+    return clauses
+
+
+def json_response(status: int, data: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    response_headers = {"Content-Type": "application/json; charset=UTF-8"}
+    response_headers.update(headers or {})
+    return status, response_headers, json.dumps(data).encode("utf-8")
+
+
+def error_response(status: int, message: str, reason: str) -> Response:
+    return json_response(
+        status,
+        {
+            "error": {
+                "code": status,
+                "message": message,
+                "errors": [{"domain": "global", "reason": reason, "message": message}],
+            }
+        },
+    )
+
+
+class DriveStandIn:
+    """
+    In-memory Drive v3 for the calls upload_drive_artifacts makes: files
+    list/create/get/update/delete, permissions.create, batch requests and
+    resumable or multipart uploads, plus the OAuth token endpoint. File
+    bodies are written under storage_dir.
+
+    As in Drive, a trashed file is still served by ID with trashed set,
+    and trashing a folder trashes everything under it. New files are
+    rejected with a 404 when a parent is unknown or, unlike in Drive,
+    trashed, so an upload into a stale cached folder fails instead of
+    landing in the trash.
+
+    latency_ms is added to every HTTP round trip; quota_error_rate is the
+    chance that a request is rejected with 429 rateLimitExceeded.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Path,
+        latency_ms: float = 0.0,
+        quota_error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.storage_dir = storage_dir
+        self.latency_ms = latency_ms
+        self.quota_error_rate = quota_error_rate
+        self.random = random.Random(seed)
+        self.base_url = ""
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.files: Dict[str, Dict[str, Any]] = {}
+            self.uploads: Dict[str, Dict[str, Any]] = {}
+            self.stats: Counter = Counter()
+
+            if self.storage_dir.exists():
+                shutil.rmtree(self.storage_dir)
+            self.storage_dir.mkdir(parents=True)
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += amount
+
+    def should_reject(self) -> bool:
+        if self.quota_error_rate <= 0:
+            return False
+
+        with self.lock:
+            return self.random.random() < self.quota_error_rate
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:20]
+
+    def public_file(self, file: Dict[str, Any]) -> Dict[str, Any]:
+        data = {key: value for key, value in file.items() if key != "permissions"}
+        data["kind"] = "drive#file"
+        return data
+
+    # --- files -----------------------------------------------------------
+
+    def create_file(self, metadata: Dict[str, Any], content: Optional[bytes] = None) -> Dict[str, Any]:
+        file_id = self.new_id()
+        file = {
+            "id": file_id,
+            "name": metadata.get("name", "Untitled"),
+            "mimeType": metadata.get("mimeType", "application/octet-stream"),
+            "parents": list(metadata.get("parents", [])),
+            "webViewLink": f"{self.base_url}/file/d/{file_id}/view",
+            "trashed": False,
+            "permissions": [],
+        }
+
+        with self.lock:
+            self.files[file_id] = file
+
+        if content is not None:
+            self.write_content(file_id, content)
+
+        return file
+
+    def parent_error(self, metadata: Dict[str, Any]) -> Optional[Response]:
+        with self.lock:
+            for parent_id in metadata.get("parents", []):
+                parent = self.files.get(parent_id)
+                if parent is None or parent["trashed"]:
+                    return error_response(404, f"File not found: {parent_id}.", "notFound")
+        return None
+
+    def trash_file(self, file_id: str) -> None:
+        with self.lock:
+            pending = [file_id]
+            while pending:
+                parent_id = pending.pop()
+                self.files[parent_id]["trashed"] = True
+                pending.extend(file["id"] for file in self.files.values() if parent_id in file["parents"])
+
+    def write_content(self, file_id: str, content: bytes) -> None:
+        (self.storage_dir / file_id).write_bytes(content)
+
+        with self.lock:
+            file = self.files[file_id]
+            file["md5Checksum"] = hashlib.md5(content).hexdigest()
+            file["size"] = str(len(content))
+            file["webContentLink"] = f"{self.base_url}/uc?id={file_id}&export=download"
+            self.stats["uploaded_bytes"] += len(content)
+
+    def list_files(self, params: Dict[str, str]) -> Response:
+        try:
+            clauses = parse_query(params.get("q", ""))
+        except ValueError as e:
+            return error_response(400, str(e), "invalidQuery")
+
+        def matches(file: Dict[str, Any]) -> bool:
+            for field, op, value in clauses:
+                if field == "parents":
+                    if value not in file["parents"]:
+                        return False
+                elif field == "trashed":
+                    if file["trashed"] != (value == "true"):
+                        return False
+                elif (file.get(field) == value) != (op == "="):
+                    return False
+            return True
+
+        with self.lock:
+            found = [self.public_file(file) for file in self.files.values() if matches(file)]
+
+        page_size = int(params.get("pageSize", "100"))
+        start = int(params.get("pageToken", "0") or "0")
+        data: Dict[str, Any] = {"kind": "drive#fileList", "files": found[start:start + page_size]}
+
+        if start + page_size < len(found):
+            data["nextPageToken"] = str(start + page_size)
+
+        return json_response(200, data)
+
+    def get_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.files.get(file_id)
+
+    def handle_api(self, method: str, path: str, params: Dict[str, str], body: bytes) -> Response:
+        parts = [part for part in path.split("/") if part]
+
+        if parts[:3] != ["drive", "v3", "files"]:
+            return error_response(404, f"Unknown path: {path}", "notFound")
+
+        if len(parts) == 3:
+            if method == "GET":
+                return self.list_files(params)
+            if method == "POST":
+                metadata = json.loads(body or b"{}")
+                return self.parent_error(metadata) or json_response(200, self.public_file(self.create_file(metadata)))
+            return error_response(405, f"Unsupported method: {method}", "badRequest")
+
+        file = self.get_file(parts[3])
+        if file is None:
+            return error_response(404, f"File not found: {parts[3]}.", "notFound")
+
+        if len(parts) == 4:
+            if method == "GET":
+                return json_response(200, self.public_file(file))
+            if method == "DELETE":
+                with self.lock:
+                    self.files.pop(file["id"], None)
+                (self.storage_dir / file["id"]).unlink(missing_ok=True)
+                return 204, {}, b""
+            if method == "PATCH":
+                metadata = json.loads(body or b"{}")
+                with self.lock:
+                    file["name"] = metadata.get("name", file["name"])
+                if metadata.get("trashed"):
+                    self.trash_file(file["id"])
+                return json_response(200, self.public_file(file))
+
+        if len(parts) == 5 and parts[4] == "permissions" and method == "POST":
+            permission = json.loads(body or b"{}")
+            permission["id"] = "anyoneWithLink" if permission.get("type") == "anyone" else self.new_id()
+            with self.lock:
+                file["permissions"].append(permission)
+            return json_response(200, dict(permission, kind="drive#permission"))
+
+        return error_response(405, f"Unsupported call: {method} {path}", "badRequest")
+
+    # --- uploads ---------------------------------------------------------
+
+    def handle_upload(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> Response:
+        parts = [part for part in path.split("/") if part]
+        file_id = parts[4] if len(parts) > 4 else None
+        upload_type = params.get("uploadType", "")
+
+        if file_id and self.get_file(file_id) is None:
+            return error_response(404, f"File not found: {file_id}.", "notFound")
+
+        if method == "PUT" and "upload_id" in params:
+            return self.receive_chunk(params["upload_id"], headers, body)
+
+        if upload_type == "resumable":
+            metadata = json.loads(body or b"{}")
+            rejected = self.parent_error(metadata) if file_id is None else None
+            if rejected:
+                return rejected
+
+            upload_id = self.new_id()
+            with self.lock:
+                self.uploads[upload_id] = {
+                    "file_id": file_id,
+                    "metadata": metadata,
+                    "data": bytearray(),
+                }
+            location = f"{self.base_url}{path}?uploadType=resumable&upload_id={upload_id}"
+            return 200, {"Location": location, "Content-Length": "0"}, b""
+
+        if upload_type in ("multipart", "media"):
+            metadata, content = self.parse_upload_body(upload_type, headers, body)
+            rejected = self.parent_error(metadata) if file_id is None else None
+            if rejected:
+                return rejected
+            return self.finish_upload(file_id, metadata, content)
+
+        return error_response(400, f"Unsupported uploadType: {upload_type}", "badRequest")
+
+    def parse_upload_body(self, upload_type: str, headers: Dict[str, str], body: bytes) -> Tuple[Dict[str, Any], bytes]:
+        if upload_type == "media":
+            return {}, body
+
+        message = email.message_from_bytes(
+            f"Content-Type: {headers.get('content-type', '')}\r\n\r\n".encode("utf-8") + body
+        )
+        payloads = [part.get_payload(decode=True) or b"" for part in message.get_payload()]
+        return json.loads(payloads[0] or b"{}"), payloads[1] if len(payloads) > 1 else b""
+
+    def receive_chunk(self, upload_id: str, headers: Dict[str, str], body: bytes) -> Response:
+        with self.lock:
+            upload = self.uploads.get(upload_id)
+
+        if upload is None:
+            return error_response(404, f"Unknown upload session: {upload_id}", "notFound")
+
+        match = re.match(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)", headers.get("content-range", ""))
+        data: bytearray = upload["data"]
+
+        if match and match.group(1) is not None:
+            start = int(match.group(1))
+            if start != len(data):
+                return error_response(400, "Chunk does not continue the upload", "badContent")
+            data.extend(body)
+        elif not match:
+            data.extend(body)
+
+        total = match.group(3) if match else str(len(data))
+
+        if total != "*" and len(data) >= int(total):
+            with self.lock:
+                self.uploads.pop(upload_id, None)
+            return self.finish_upload(upload["file_id"], upload["metadata"], bytes(data))
+
+        range_headers = {"Range": f"bytes=0-{len(data) - 1}"} if data else {}
+        return 308, dict(range_headers, **{"Content-Length": "0"}), b""
+
+    def finish_upload(self, file_id: Optional[str], metadata: Dict[str, Any], content: bytes) -> Response:
+        if file_id is None:
+            file = self.create_file(metadata, content)
+        else:
+            self.write_content(file_id, content)
+            file = self.get_file(file_id) or {}
+
+        return json_response(200, self.public_file(file))
+
+    # --- batch -----------------------------------------------------------
+
+    def handle_batch(self, headers: Dict[str, str], body: bytes) -> Response:
+        message = email.message_from_bytes(
+            f"Content-Type: {headers.get('content-type', '')}\r\n\r\n".encode("utf-8") + body
+        )
+        parts = message.get_payload()
+
+        if len(parts) > BATCH_LIMIT:
+            return error_response(400, f"A batch may hold at most {BATCH_LIMIT} calls", "batchSizeTooLarge")
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        chunks: List[bytes] = []
+
+        for part in parts:
+            status, inner_headers, inner_body = self.dispatch_serialized(part.get_payload())
+            self.count("batched_calls")
+
+            head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+            head += [f"{key}: {value}" for key, value in inner_headers.items()]
+            head.append(f"Content-Length: {len(inner_body)}")
+
+            content_id = part.get("Content-ID", "<>")[1:-1]
+            chunks.append(
+                (
+                    f"--{boundary}\r\n"
+                    f"Content-Type: application/http\r\n"
+                    f"Content-ID: <response-{content_id}>\r\n\r\n"
+                    + "\r\n".join(head)
+                    + "\r\n\r\n"
+                ).encode("utf-8")
+                + inner_body
+                + b"\r\n"
+            )
+
+        chunks.append(f"--{boundary}--\r\n".encode("utf-8"))
+        return 200, {"Content-Type": f"multipart/mixed; boundary={boundary}"}, b"".join(chunks)
+
+    def dispatch_serialized(self, serialized: str) -> Response:
+        head, _, body = serialized.replace("\r\n", "\n").partition("\n\n")
+        request_line = head.split("\n", 1)[0]
+        method, target, _ = request_line.split(" ", 2)
+        split = urlsplit(target)
+        return self.handle_api(method, split.path, dict(parse_qsl(split.query)), body.encode("utf-8"))
+
+    # --- routing ---------------------------------------------------------
+
+    def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        split = urlsplit(target)
+        path = split.path
+        params = dict(parse_qsl(split.query))
+
+        if path == "/token":
+            self.count("token_requests")
+            return json_response(200, {"access_token": "stand-in-token", "expires_in": 3600, "token_type": "Bearer"})
+
+        self.count("round_trips")
+        self.count(f"{method} {self.route_label(path, params)}")
+
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+        if self.should_reject():
+            self.count("quota_errors")
+            return error_response(429, "Rate Limit Exceeded", "rateLimitExceeded")
+
+        if path.startswith("/batch/"):
+            return self.handle_batch(headers, body)
+
+        if path.startswith("/upload/"):
+            return self.handle_upload(method, path, params, headers, body)
+
+        return self.handle_api(method, path, params, body)
+
+    def route_label(self, path: str, params: Dict[str, str]) -> str:
+        if path.startswith("/batch/"):
+            return "batch"
+
+        if path.startswith("/upload/"):
+            return "upload chunk" if "upload_id" in params else "upload start"
+
+        parts = [part for part in path.split("/") if part][2:]
+        return "/".join("{id}" if index == 1 else part for index, part in enumerate(parts))
+
+
+def make_handler(drive: DriveStandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_request(self) -> None:
+            length = int(self.headers.get("Content-Length", "0") or "0")
+            body = self.rfile.read(length) if length else b""
+            headers = {key.lower(): value for key, value in self.headers.items()}
+
+            status, response_headers, payload = drive.handle(self.command, self.path, headers, body)
+
+            self.send_response(status)
+            for key, value in response_headers.items():
+                if key.lower() != "content-length":
+                    self.send_header(key, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_request
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def start_server(drive: DriveStandIn, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(drive))
+    server.daemon_threads = True
+    drive.base_url = f"http://{host}:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local Drive v3 stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--storage-dir", default="")
+    args = parser.parse_args()
+
+    storage_dir = Path(args.storage_dir) if args.storage_dir else Path(tempfile.mkdtemp(prefix="drive_stand_in_"))
+    drive = DriveStandIn(storage_dir, latency_ms=args.latency_ms, quota_error_rate=args.quota_error_rate)
+    server = start_server(drive, args.host, args.port)
+
+    print(f"Drive stand-in listening on {drive.base_url}")
+    print(f"Storage: {storage_dir}")
+    print(f"Set GOOGLE_API_ENDPOINT={drive.base_url} and a service account JSON with token_uri={drive.base_url}/token")
+
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+
+
+DRIVE_FILE_SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+DRIVE_FULL_SCOPES = ["https://www.googleapis.com/auth/drive"]
+
+DEFAULT_HTTP_TIMEOUT = 120
+
+# Shared by every thread: credentials keyed by scopes, and discovery
+# documents keyed by (api, version, endpoint).
+CREDENTIALS_CACHE: Dict[Tuple[str, ...], service_account.Credentials] = {}
+DISCOVERY_CACHE: Dict[Tuple[str, str, str], str] = {}
+CACHE_LOCK = threading.Lock()
+
+# httplib2 is not thread-safe, so each thread builds its own transport
+# and service objects on top of the shared credentials.
+THREAD_STATE = threading.local()
+
+
+def get_api_endpoint() -> str:
+    """
+    Optional base URL replacing https://www.googleapis.com/ for every
+    request, including uploads and batches. Used to run against a local
+    stand-in server.
+    """
+    return os.getenv("GOOGLE_API_ENDPOINT", "").strip().rstrip("/")
+
+
+def load_discovery_document(api: str, version: str) -> str:
+    """
+    Return the discovery document bundled with google-api-python-client,
+    so building a service never fetches it over the network.
+    """
+    endpoint = get_api_endpoint()
+    key = (api, version, endpoint)
+
+    with CACHE_LOCK:
+        if key in DISCOVERY_CACHE:
+            return DISCOVERY_CACHE[key]
+
+        document = get_static_doc(api, version)
+
+        if document is None:
+            raise RuntimeError(f"No bundled discovery document for {api} {version}")
+
+        if endpoint:
+            data = json.loads(document)
+            data["rootUrl"] = f"{endpoint}/"
+            data["baseUrl"] = f"{endpoint}/{data.get('servicePath', '')}"
+            document = json.dumps(data)
+
+        DISCOVERY_CACHE[key] = document
+        return document
+
+
+def load_service_account_info() -> Dict[str, Any]:
+    raw_json = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON", "").strip()
+
+    if not raw_json:
+        raise RuntimeError("Missing GOOGLE_SERVICE_ACCOUNT_JSON")
+
+    return json.loads(raw_json)
+
+
+def get_credentials(scopes: Sequence[str]) -> service_account.Credentials:
+    key = tuple(sorted(scopes))
+
+    with CACHE_LOCK:
+        credentials = CREDENTIALS_CACHE.get(key)
+
+        if credentials is None:
+            credentials = service_account.Credentials.from_service_account_info(
+                load_service_account_info(),
+                scopes=list(scopes),
+            )
+            CREDENTIALS_CACHE[key] = credentials
+
+    return credentials
+
+
+def refresh_credentials(credentials: service_account.Credentials) -> None:
+    """
+    Refresh an expired token once for all threads. Without the lock every
+    worker that notices the expiry would request its own token.
+    """
+    if credentials.valid:
+        return
+
+    with CACHE_LOCK:
+        if not credentials.valid:
+            request = google_auth_httplib2.Request(httplib2.Http(timeout=DEFAULT_HTTP_TIMEOUT))
+            credentials.refresh(request)
+
+
+def get_service(api: str, version: str, scopes: Sequence[str]):
+    """
+    Return this thread's service for api/version, building it on first use
+    from the bundled discovery document and a thread-local AuthorizedHttp.
+    """
+    credentials = get_credentials(scopes)
+    refresh_credentials(credentials)
+
+    services = getattr(THREAD_STATE, "services", None)
+    if services is None:
+        services = {}
+        THREAD_STATE.services = services
+
+    key = (api, version, tuple(sorted(scopes)), get_api_endpoint())
+    service = services.get(key)
+
+    if service is None:
+        # build_http stops httplib2 from treating the 308 "resume incomplete"
+        # replies of resumable uploads as redirects.
+        transport = build_http()
+        transport.timeout = DEFAULT_HTTP_TIMEOUT
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=transport)
+        service = build_from_document(load_discovery_document(api, version), http=http)
+        services[key] = service
+
+    return service
+
+
+def get_drive_service(scopes: Sequence[str] = DRIVE_FILE_SCOPES):
+    return get_service("drive", "v3", scopes)
@@ -0,0 +1,695 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - advisory locking is POSIX-only
+    fcntl = None
+
+from src.delivery_record import MISSING, ClientDeliveryRecord, record_to_json
+
+
+MANIFEST_JSON_NAME = "distribution_manifest.json"
+MANIFEST_DB_NAME = "distribution_manifest.sqlite3"
+MANIFEST_LOCK_NAME = "distribution_manifest.lock"
+
+# Top-level fields every save rewrites; they never count as merge conflicts.
+ALWAYS_OURS_FIELDS = {"last_updated_at"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest_fields (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS client_records (
+    position INTEGER PRIMARY KEY,
+    client_id TEXT,
+    record TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS client_records_client_id ON client_records (client_id);
+
+CREATE TABLE IF NOT EXISTS client_field_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT,
+    field TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT,
+    stage TEXT,
+    changed_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS store_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# The client list lives in client_records; this placeholder keeps its
+# position among the top-level keys so the JSON export keeps its layout.
+CLIENTS_KEY = "clients"
+
+class ManifestMergeConflict(RuntimeError):
+    def __init__(self, conflicts: List[str]) -> None:
+        self.conflicts = conflicts
+        super().__init__(
+            "Distribution manifest changed underneath this save: " + "; ".join(conflicts)
+        )
+
+
+class ManifestDocument(dict):
+    """
+    A manifest returned by load_manifest. base holds the encoded top-level
+    fields as they were loaded, so save_manifest can merge instead of
+    overwriting fields another writer changed in the meantime.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.base: Dict[str, str] = {}
+
+    def snapshot(self) -> None:
+        self.base = {
+            key: encode(value)
+            for key, value in self.items()
+            if key != CLIENTS_KEY
+        }
+
+
+def client_changed(client: Dict[str, Any]) -> bool:
+    """
+    True when a client record has unsaved field changes. Plain dicts
+    carry no change history and are always treated as changed.
+    """
+    if isinstance(client, ClientDeliveryRecord):
+        return client.is_dirty
+
+    return True
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def manifest_json_path(week_dir: Path) -> Path:
+    return week_dir / MANIFEST_JSON_NAME
+
+
+def manifest_db_path(week_dir: Path) -> Path:
+    return week_dir / MANIFEST_DB_NAME
+
+
+def encode(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=record_to_json)
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@contextmanager
+def manifest_lock(week_dir: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on the week's manifest. It covers the
+    database and the JSON export together, so no writer ever sees one
+    updated without the other.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with (week_dir / MANIFEST_LOCK_NAME).open("a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def transaction(week_dir: Path, commit: bool = True) -> Iterator[sqlite3.Connection]:
+    """
+    Open the week's manifest database and hold a write lock until the block
+    exits. Everything inside the block commits together or not at all; with
+    commit=False it is always rolled back.
+    """
+    with manifest_lock(week_dir):
+        conn = sqlite3.connect(manifest_db_path(week_dir), timeout=30, isolation_level=None)
+
+        try:
+            conn.executescript(SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            conn.execute("COMMIT" if commit else "ROLLBACK")
+        finally:
+            conn.close()
+
+
+@contextmanager
+def read_transaction(week_dir: Path) -> Iterator[sqlite3.Connection]:
+    """
+    Open the week's manifest database for reading only. No lock is taken,
+    so readers never wait on each other, and every read inside the block
+    sees the same committed state.
+    """
+    conn = sqlite3.connect(manifest_db_path(week_dir), timeout=30, isolation_level=None)
+
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN DEFERRED")
+
+        try:
+            yield conn
+        finally:
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+
+def get_state(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM store_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_state(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute(
+        "INSERT INTO store_state (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+
+
+def read_manifest(conn: sqlite3.Connection, as_records: bool = True) -> Dict[str, Any]:
+    rows = conn.execute("SELECT position, record FROM client_records ORDER BY position")
+
+    if as_records:
+        clients: List[Any] = [
+            ClientDeliveryRecord.from_dict(json.loads(record), position=position)
+            for position, record in rows
+        ]
+    else:
+        clients = [json.loads(record) for _, record in rows]
+
+    manifest: Dict[str, Any] = {}
+
+    for key, value in conn.execute("SELECT key, value FROM manifest_fields ORDER BY position"):
+        manifest[key] = clients if key == CLIENTS_KEY else json.loads(value)
+
+    manifest.setdefault(CLIENTS_KEY, clients)
+    return manifest
+
+
+def write_fields(conn: sqlite3.Connection, manifest: Dict[str, Any]) -> int:
+    existing = {
+        key: (position, value)
+        for key, position, value in conn.execute("SELECT key, position, value FROM manifest_fields")
+    }
+
+    changed = 0
+
+    for position, (key, value) in enumerate(manifest.items()):
+        encoded = "null" if key == CLIENTS_KEY else encode(value)
+
+        if existing.pop(key, None) == (position, encoded):
+            continue
+
+        conn.execute(
+            "INSERT INTO manifest_fields (key, position, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET position = excluded.position, value = excluded.value",
+            (key, position, encoded),
+        )
+        changed += 1
+
+    for key in existing:
+        conn.execute("DELETE FROM manifest_fields WHERE key = ?", (key,))
+        changed += 1
+
+    return changed
+
+
+def merge_fields(conn: sqlite3.Connection, manifest: ManifestDocument, conflicts: List[str]) -> None:
+    """
+    Three-way merge of top-level fields: base is what this writer loaded,
+    theirs is what is stored now, ours is the manifest being saved. Fields
+    only another writer changed are left alone.
+    """
+    theirs = {
+        key: value
+        for key, value in conn.execute("SELECT key, value FROM manifest_fields")
+    }
+    next_position = conn.execute(
+        "SELECT COALESCE(MAX(position), -1) + 1 FROM manifest_fields"
+    ).fetchone()[0]
+
+    for key, value in manifest.items():
+        if key == CLIENTS_KEY:
+            continue
+
+        ours = encode(value)
+        base = manifest.base.get(key)
+
+        if ours == base:
+            continue
+
+        current = theirs.get(key)
+
+        if current not in (base, ours) and key not in ALWAYS_OURS_FIELDS:
+            conflicts.append(f"manifest field '{key}'")
+            continue
+
+        if key in theirs:
+            conn.execute("UPDATE manifest_fields SET value = ? WHERE key = ?", (ours, key))
+        else:
+            conn.execute(
+                "INSERT INTO manifest_fields (key, position, value) VALUES (?, ?, ?)",
+                (key, next_position, ours),
+            )
+            next_position += 1
+
+    for key, base in manifest.base.items():
+        if key in manifest or key not in theirs:
+            continue
+
+        if theirs[key] != base:
+            conflicts.append(f"manifest field '{key}'")
+            continue
+
+        conn.execute("DELETE FROM manifest_fields WHERE key = ?", (key,))
+
+
+def merge_client(
+    conn: sqlite3.Connection,
+    position: int,
+    client: ClientDeliveryRecord,
+    conflicts: List[str],
+) -> None:
+    """
+    Apply this record's changed fields on top of the stored row. A field is
+    a conflict only when another writer changed it to a different value.
+    """
+    client_id = client.get("client_id")
+    row = conn.execute(
+        "SELECT client_id, record FROM client_records WHERE position = ?",
+        (position,),
+    ).fetchone()
+
+    if not row or row[0] != client_id:
+        conflicts.append(f"client '{client_id}' moved or was removed")
+        return
+
+    theirs = json.loads(row[1])
+
+    for field, (base, ours) in client.changed_fields.items():
+        current = theirs.get(field, MISSING)
+
+        if current != base and current != ours:
+            conflicts.append(f"client '{client_id}' field '{field}'")
+            continue
+
+        if ours is MISSING:
+            theirs.pop(field, None)
+        else:
+            theirs[field] = ours
+
+    conn.execute(
+        "UPDATE client_records SET record = ? WHERE position = ?",
+        (encode(theirs), position),
+    )
+
+
+def merge_clients(conn: sqlite3.Connection, clients: List[Any], conflicts: List[str]) -> None:
+    for position, client in enumerate(clients):
+        if isinstance(client, ClientDeliveryRecord) and client.position == position:
+            if client.is_dirty:
+                merge_client(conn, position, client, conflicts)
+            continue
+
+        # Records without a load-time position have no merge base.
+        conn.execute(
+            "INSERT INTO client_records (position, client_id, record) VALUES (?, ?, ?) "
+            "ON CONFLICT(position) DO UPDATE SET client_id = excluded.client_id, record = excluded.record",
+            (position, client.get("client_id"), encode(client)),
+        )
+
+
+def encode_audit_value(value: Any) -> Optional[str]:
+    return None if value is MISSING else encode(value)
+
+
+def write_audit(
+    conn: sqlite3.Connection,
+    clients: List[Dict[str, Any]],
+    stage: Optional[str],
+) -> int:
+    changed_at = now_iso()
+    rows = [
+        (
+            client.get("client_id"),
+            field,
+            encode_audit_value(old),
+            encode_audit_value(new),
+            stage,
+            changed_at,
+        )
+        for client in clients
+        if isinstance(client, ClientDeliveryRecord)
+        for field, (old, new) in client.changed_fields.items()
+    ]
+
+    conn.executemany(
+        "INSERT INTO client_field_audit (client_id, field, old_value, new_value, stage, changed_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+    return len(rows)
+
+
+def write_clients(conn: sqlite3.Connection, clients: List[Dict[str, Any]]) -> int:
+    existing = {
+        position: record
+        for position, record in conn.execute("SELECT position, record FROM client_records")
+    }
+
+    changed = 0
+
+    for position, client in enumerate(clients):
+        # Clean tracked records at their original position are already stored
+        # as-is, so they are not re-encoded.
+        if (
+            isinstance(client, ClientDeliveryRecord)
+            and not client.is_dirty
+            and client.position == position
+            and position in existing
+        ):
+            existing.pop(position)
+            continue
+
+        encoded = encode(client)
+
+        if existing.pop(position, None) == encoded:
+            continue
+
+        conn.execute(
+            "INSERT INTO client_records (position, client_id, record) VALUES (?, ?, ?) "
+            "ON CONFLICT(position) DO UPDATE SET client_id = excluded.client_id, record = excluded.record",
+            (position, client.get("client_id"), encoded),
+        )
+        changed += 1
+
+    for position in existing:
+        conn.execute("DELETE FROM client_records WHERE position = ?", (position,))
+        changed += 1
+
+    return changed
+
+
+def write_json_atomic(path: Path, data: Dict[str, Any]) -> bytes:
+    payload = json.dumps(data, indent=2).encode("utf-8")
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    with tmp_path.open("wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+    return payload
+
+
+def set_last_updated(conn: sqlite3.Connection, value: str) -> None:
+    conn.execute(
+        "INSERT INTO manifest_fields (key, position, value) VALUES ('last_updated_at', "
+        "(SELECT COALESCE(MAX(position), -1) + 1 FROM manifest_fields), ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (encode(value),),
+    )
+
+
+def export_json(conn: sqlite3.Connection, week_dir: Path) -> Path:
+    """
+    Rewrite distribution_manifest.json from the database. The file is
+    replaced atomically, so readers never see a half-written manifest.
+    """
+    path = manifest_json_path(week_dir)
+    payload = write_json_atomic(path, read_manifest(conn, as_records=False))
+    set_state(conn, "json_export_sha256", sha256_bytes(payload))
+    return path
+
+
+def json_is_current(conn: sqlite3.Connection, week_dir: Path) -> bool:
+    """True when distribution_manifest.json is missing or is this store's last export."""
+    path = manifest_json_path(week_dir)
+
+    if not path.exists():
+        return True
+
+    return sha256_bytes(path.read_bytes()) == get_state(conn, "json_export_sha256")
+
+
+def import_json_if_changed(conn: sqlite3.Connection, week_dir: Path) -> bool:
+    """
+    Pull distribution_manifest.json into the database when it was written by
+    something other than this store (first run, manual edit, legacy script).
+    """
+    path = manifest_json_path(week_dir)
+
+    if not path.exists():
+        return False
+
+    payload = path.read_bytes()
+    digest = sha256_bytes(payload)
+
+    if digest == get_state(conn, "json_export_sha256"):
+        return False
+
+    manifest = json.loads(payload.decode("utf-8"))
+    write_fields(conn, manifest)
+    write_clients(conn, manifest.get(CLIENTS_KEY, []))
+    set_state(conn, "json_export_sha256", digest)
+    return True
+
+
+def load_manifest(week_dir: Path) -> Dict[str, Any]:
+    if not manifest_json_path(week_dir).exists() and not manifest_db_path(week_dir).exists():
+        raise RuntimeError(f"Missing distribution manifest: {manifest_json_path(week_dir)}")
+
+    # The usual case reads without the write lock; only a JSON file that
+    # something else wrote needs the locked import.
+    with read_transaction(week_dir) as conn:
+        manifest = ManifestDocument(read_manifest(conn)) if json_is_current(conn, week_dir) else None
+
+    if manifest is None:
+        with transaction(week_dir) as conn:
+            import_json_if_changed(conn, week_dir)
+            manifest = ManifestDocument(read_manifest(conn))
+
+    manifest.snapshot()
+    return manifest
+
+
+def save_manifest(week_dir: Path, manifest: Dict[str, Any], stage: Optional[str] = None) -> Path:
+    """
+    Persist a manifest loaded with load_manifest. Only client rows whose
+    content changed are rewritten in the database, and each changed field is
+    recorded in client_field_audit under the given stage name.
+
+    Changes made by other writers since the load are kept: this save's
+    changes are merged field by field on top of them. If both sides changed
+    the same field to different values, ManifestMergeConflict is raised and
+    nothing is written.
+
+    A save that changes nothing leaves last_updated_at and the JSON export
+    as they are.
+    """
+    clients = manifest.get(CLIENTS_KEY, [])
+
+    with transaction(week_dir) as conn:
+        import_json_if_changed(conn, week_dir)
+        changes_before = conn.total_changes
+
+        if isinstance(manifest, ManifestDocument):
+            conflicts: List[str] = []
+            merge_fields(conn, manifest, conflicts)
+            merge_clients(conn, clients, conflicts)
+
+            if conflicts:
+                raise ManifestMergeConflict(conflicts)
+        else:
+            write_fields(conn, manifest)
+            write_clients(conn, clients)
+
+        if conn.total_changes != changes_before or not manifest_json_path(week_dir).exists():
+            manifest["last_updated_at"] = now_iso()
+            set_last_updated(conn, manifest["last_updated_at"])
+            write_audit(conn, clients, stage)
+            export_json(conn, week_dir)
+
+    path = manifest_json_path(week_dir)
+
+    for position, client in enumerate(clients):
+        if isinstance(client, ClientDeliveryRecord):
+            client.mark_clean()
+            client.position = position
+
+    if isinstance(manifest, ManifestDocument):
+        manifest.snapshot()
+
+    return path
+
+
+def replace_manifest(week_dir: Path, manifest: Dict[str, Any]) -> Path:
+    with transaction(week_dir) as conn:
+        conn.execute("DELETE FROM manifest_fields")
+        conn.execute("DELETE FROM client_records")
+        write_fields(conn, manifest)
+        write_clients(conn, manifest.get(CLIENTS_KEY, []))
+        return export_json(conn, week_dir)
+
+
+ClientUpdates = Dict[str, Dict[str, Any]]
+FieldChange = Tuple[str, str, Any, Any]
+
+
+class ClientNotFound(RuntimeError):
+    pass
+
+
+def apply_client_updates(
+    conn: sqlite3.Connection,
+    week_dir: Path,
+    select: Callable[[List[ClientDeliveryRecord]], ClientUpdates],
+    stage: Optional[str],
+    dry_run: bool,
+) -> List[FieldChange]:
+    """
+    Load every client row, let select decide which fields change on which
+    clients, and write only the rows that actually changed. Any unknown
+    client, type error or invalid status transition aborts the whole batch.
+    """
+    records = [
+        ClientDeliveryRecord.from_dict(json.loads(record), position=position)
+        for position, record in conn.execute(
+            "SELECT position, record FROM client_records ORDER BY position"
+        )
+    ]
+    by_id = {record.get("client_id"): record for record in records}
+
+    updates = select(records)
+    missing = [client_id for client_id in updates if client_id not in by_id]
+
+    if missing:
+        raise ClientNotFound(
+            f"Client not found in distribution manifest: {', '.join(missing)}"
+        )
+
+    changed: List[ClientDeliveryRecord] = []
+    diffs: List[FieldChange] = []
+
+    for client_id, fields in updates.items():
+        record = by_id[client_id]
+        record.update(fields)
+
+        if not record.is_dirty:
+            continue
+
+        changed.append(record)
+        diffs.extend(
+            (client_id, field, old, new)
+            for field, (old, new) in record.changed_fields.items()
+        )
+
+    if dry_run or not changed:
+        return diffs
+
+    write_audit(conn, changed, stage)
+
+    conn.executemany(
+        "UPDATE client_records SET record = ? WHERE position = ?",
+        [(encode(record), record.position) for record in changed],
+    )
+    set_last_updated(conn, now_iso())
+
+    export_json(conn, week_dir)
+    return diffs
+
+
+def require_manifest(week_dir: Path) -> None:
+    if not manifest_json_path(week_dir).exists() and not manifest_db_path(week_dir).exists():
+        raise RuntimeError(f"Missing distribution manifest: {manifest_json_path(week_dir)}")
+
+
+def update_clients(
+    week_dir: Path,
+    updates: ClientUpdates,
+    stage: Optional[str] = None,
+    dry_run: bool = False,
+) -> List[FieldChange]:
+    """
+    Apply {client_id: {field: value}} updates in one transaction. Returns
+    (client_id, field, old, new) for every field that changes; with
+    dry_run the transaction is rolled back and nothing is written.
+    """
+    require_manifest(week_dir)
+
+    with transaction(week_dir, commit=not dry_run) as conn:
+        import_json_if_changed(conn, week_dir)
+        return apply_client_updates(conn, week_dir, lambda records: updates, stage, dry_run)
+
+
+def update_matching_clients(
+    week_dir: Path,
+    where: Dict[str, Any],
+    fields: Dict[str, Any],
+    stage: Optional[str] = None,
+    dry_run: bool = False,
+) -> List[FieldChange]:
+    """
+    Set fields on every client whose values equal all of where, selected and
+    updated inside the same transaction.
+    """
+    require_manifest(week_dir)
+
+    def select(records: List[ClientDeliveryRecord]) -> ClientUpdates:
+        return {
+            record.get("client_id"): dict(fields)
+            for record in records
+            if all(record.get(key) == value for key, value in where.items())
+        }
+
+    with transaction(week_dir, commit=not dry_run) as conn:
+        import_json_if_changed(conn, week_dir)
+        return apply_client_updates(conn, week_dir, select, stage, dry_run)
+
+
+def update_client_fields(
+    week_dir: Path,
+    client_id: str,
+    fields: Dict[str, Any],
+    stage: Optional[str] = None,
+) -> bool:
+    """
+    Apply field updates to a single client row in one transaction.
+    Returns False when the client is not in the manifest.
+    """
+    try:
+        update_clients(week_dir, {client_id: fields}, stage=stage)
+    except ClientNotFound:
+        return False
+
+    return True
@@ -1,25 +1,20 @@
 # src/notify_webhook.py
 import os, json, time
 from pathlib import Path
-import requests
+from src import webhook_http
 
 WEBHOOK_URL   = os.environ.get("WEBHOOK_URL", "")
 WEBHOOK_TOKEN = os.environ.get("WEBHOOK_TOKEN", "")  # <- add this secret in GH
 
 def _post_with_retry(url, json_payload, tries=5, base_delay=1.0):
+    # Same pooled, signed (WEBHOOK_SECRET) POST as send_webhook_notifications.
     last = None
     for i in range(tries):
-        try:
-            r = requests.post(url, json=json_payload, timeout=20)
-            if r.status_code in (200, 202):
-                return r
-            last = r
-        except requests.RequestException as e:
-            last = e
+        last = webhook_http.post_json(url, json_payload)
+        if last["status_code"] in (200, 202):
+            return last
         time.sleep(base_delay * (2 ** i))
-    if isinstance(last, requests.Response):
-        last.raise_for_status()
-    raise RuntimeError(f"Webhook failed after {tries} attempts: {last}")
+    raise RuntimeError(f"Webhook failed after {tries} attempts: {last['status_code']} {last['response_body']}")
 
 def main():
     if not WEBHOOK_URL:
@@ -51,7 +46,7 @@ def main():
     }
 
     r = _post_with_retry(WEBHOOK_URL, payload)
-    print("Webhook status:", r.status_code)
+    print("Webhook status:", r["status_code"])
     print("Webhook notified.")
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 5
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Notion allows an average of three requests per second per integration.
+DEFAULT_RATE_LIMIT = 3.0
+
+# One keep-alive session per API key, shared by every thread.
+SESSIONS: Dict[str, requests.Session] = {}
+SESSIONS_LOCK = threading.Lock()
+
+
+class NotionAPIError(RuntimeError):
+    """A non-2xx Notion reply, with its HTTP status and Notion error code."""
+
+    def __init__(self, status: int, code: Optional[str], body: str) -> None:
+        super().__init__(f"Notion API error {status}: {body}")
+        self.status = status
+        self.code = code
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a request may be sent,
+    allowing bursts of up to capacity and an average of rate per second.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.acquired = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is free and return 0, else the seconds until one is."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.acquired += 1
+                return 0.0
+
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+def get_rate_limit() -> float:
+    value = os.getenv("NOTION_RATE_LIMIT", "").strip()
+
+    if not value:
+        return DEFAULT_RATE_LIMIT
+
+    try:
+        return max(0.1, float(value))
+    except ValueError:
+        return DEFAULT_RATE_LIMIT
+
+
+# Every Notion call in the process draws from this one bucket. A capacity
+# of one spaces requests evenly, so no one-second window exceeds the limit.
+RATE_LIMITER = TokenBucket(get_rate_limit(), 1.0)
+
+
+def get_env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+
+    if not value:
+        return default
+
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return default
+
+
+def build_retry() -> Retry:
+    """
+    Retry only failed connections inside the adapter: those never reached
+    Notion. Replies and dropped responses are retried by notion_request, so
+    every request Notion sees has taken a RATE_LIMITER token.
+    """
+    return Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        raise_on_status=False,
+    )
+
+
+def build_session(api_key: str) -> requests.Session:
+    pool_size = max(1, get_env_int("NOTION_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=build_retry(),
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION,
+        }
+    )
+    return session
+
+
+def get_session(api_key: str) -> requests.Session:
+    with SESSIONS_LOCK:
+        session = SESSIONS.get(api_key)
+
+        if session is None:
+            session = build_session(api_key)
+            SESSIONS[api_key] = session
+
+    return session
+
+
+def get_api_url() -> str:
+    # Overridable to point the pipeline at a local stand-in server.
+    return os.getenv("NOTION_API_URL", "").strip().rstrip("/") or NOTION_API_URL
+
+
+def notion_url(path: str) -> str:
+    return f"{get_api_url()}/{path.lstrip('/')}"
+
+
+def retry_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """Retry-After when Notion sends one, else exponential backoff."""
+    if response is not None:
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", "")))
+        except ValueError:
+            pass
+
+    return RETRY_BACKOFF_FACTOR * 2 ** attempt
+
+
+def is_idempotent(method: str, path: str) -> bool:
+    """
+    Whether sending the call twice leaves Notion as sending it once. Query
+    and search POSTs only read; page creates and block appends do not.
+    """
+    path = path.strip("/")
+
+    if method == "POST":
+        return path == "search" or path.endswith("/query")
+
+    if method == "PATCH":
+        return not path.endswith("/children")
+
+    return True
+
+
+def never_sent(error: requests.RequestException) -> bool:
+    """Whether the request failed before reaching Notion, so resending cannot repeat it."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+def notion_request(
+    api_key: str,
+    method: str,
+    path: str,
+    payload: Optional[Dict[str, Any]] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+) -> requests.Response:
+    """
+    Send one Notion API call through the shared session and return the raw
+    response. 429 and 5xx replies and dropped connections are retried up
+    to NOTION_HTTP_RETRIES times, each attempt waiting for its own token.
+
+    Calls that are not idempotent, such as page creates, are only retried
+    when Notion cannot have acted on them: a 429 or a failed connect. A
+    5xx or timeout is returned or raised for the caller to resolve.
+    """
+    retries = get_env_int("NOTION_HTTP_RETRIES", DEFAULT_RETRIES)
+    session = get_session(api_key)
+    idempotent = is_idempotent(method, path)
+
+    attempt = 0
+
+    while True:
+        RATE_LIMITER.acquire()
+
+        try:
+            response = session.request(
+                method,
+                notion_url(path),
+                json=payload,
+                timeout=timeout,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries or not (idempotent or never_sent(e)):
+                raise
+            response = None
+        else:
+            retryable = response.status_code in RETRY_STATUSES if idempotent else response.status_code == 429
+            if not retryable or attempt >= retries:
+                return response
+
+        time.sleep(retry_delay(response, attempt))
+        attempt += 1
+
+
+def notion_json(
+    api_key: str,
+    method: str,
+    path: str,
+    payload: Optional[Dict[str, Any]] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+) -> Dict[str, Any]:
+    response = notion_request(api_key, method, path, payload, timeout)
+
+    if not response.ok:
+        try:
+            code = response.json().get("code")
+        except (ValueError, AttributeError):
+            code = None
+
+        raise NotionAPIError(response.status_code, code, response.text)
+
+    return response.json()
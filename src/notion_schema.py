@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.notion_http import NotionAPIError, notion_json
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+OUTPUT_DIR = ROOT_DIR / "output"
+
+# Kept next to run_history.jsonl so it survives between runs.
+SCHEMA_CACHE_PATH = OUTPUT_DIR / "notion_schema_cache.json"
+
+# 0 keeps the cached schema until Notion rejects properties built from it.
+DEFAULT_TTL_HOURS = 0
+
+# Property types whose values must name an option. Notion adds unknown
+# select options on write, but rejects unknown status options.
+OPTION_TYPES = ("select", "status")
+
+# The layout publish_to_notion was written against; used when the real
+# schema cannot be read.
+DEFAULT_SCHEMA: Dict[str, Any] = {
+    "title_property": "Name",
+    "properties": {
+        "Name": "title",
+        "Status": "select",
+        "Week": "number",
+        "Year": "number",
+        "Client ID": "rich_text",
+        "PDF URL": "url",
+        "ZIP URL": "url",
+        "Markdown URL": "url",
+        "Drive Folder": "url",
+    },
+    "options": {},
+}
+
+# database_id -> schema, shared by every publishing thread.
+SCHEMAS: Dict[str, Dict[str, Any]] = {}
+SCHEMAS_LOCK = threading.Lock()
+
+T = TypeVar("T")
+
+
+class SchemaMismatch(RuntimeError):
+    """The cached schema lacks a property the pipeline needs."""
+
+
+def get_ttl() -> Optional[timedelta]:
+    """How long a cached schema is trusted, or None for no expiry."""
+    value = os.getenv("NOTION_SCHEMA_TTL_HOURS", "").strip()
+
+    try:
+        hours = float(value) if value else DEFAULT_TTL_HOURS
+    except ValueError:
+        hours = DEFAULT_TTL_HOURS
+
+    return timedelta(hours=hours) if hours > 0 else None
+
+
+def load_cache() -> Dict[str, Any]:
+    if not SCHEMA_CACHE_PATH.exists():
+        return {}
+
+    try:
+        return json.loads(SCHEMA_CACHE_PATH.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        print(f"Ignoring unreadable Notion schema cache: {SCHEMA_CACHE_PATH}")
+        return {}
+
+
+def save_cache(cache: Dict[str, Any]) -> None:
+    SCHEMA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SCHEMA_CACHE_PATH.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+
+
+def find_title_property(properties: Dict[str, str]) -> str:
+    for name, prop_type in properties.items():
+        if prop_type == "title":
+            return name
+
+    print("[notion][WARN] No 'title'-type property found. Falling back to property name 'Name'.")
+    return "Name"
+
+
+def fetch_schema(api_key: str, database_id: str) -> Dict[str, Any]:
+    database = notion_json(api_key, "GET", f"databases/{database_id}")
+
+    properties = {
+        name: prop.get("type", "")
+        for name, prop in database.get("properties", {}).items()
+    }
+
+    options = {
+        name: [option.get("name") for option in prop.get(prop.get("type"), {}).get("options", [])]
+        for name, prop in database.get("properties", {}).items()
+        if prop.get("type") in OPTION_TYPES
+    }
+
+    return {
+        "database_id": database_id,
+        "title": "".join(item.get("plain_text", "") for item in database.get("title", [])),
+        "last_edited_time": database.get("last_edited_time"),
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "title_property": find_title_property(properties),
+        "properties": properties,
+        "options": options,
+    }
+
+
+def is_fresh(schema: Dict[str, Any]) -> bool:
+    # Copies cached before option names were recorded are retrieved again.
+    if "options" not in schema:
+        return False
+
+    try:
+        fetched_at = datetime.fromisoformat(schema["fetched_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+
+    ttl = get_ttl()
+    return ttl is None or datetime.now(timezone.utc) - fetched_at < ttl
+
+
+def get_schema(
+    api_key: str,
+    database_id: str,
+    stale: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Return the database schema, retrieving it only when neither memory nor
+    the cache file holds a usable copy. Cached copies do not expire unless
+    NOTION_SCHEMA_TTL_HOURS is set.
+
+    Pass the schema that just failed as stale to force a refresh. If
+    another thread has already replaced it, that newer copy is returned
+    without a second retrieve.
+    """
+    with SCHEMAS_LOCK:
+        schema = SCHEMAS.get(database_id)
+
+        if schema is None and stale is None:
+            cached = load_cache().get(database_id)
+            if cached and is_fresh(cached):
+                schema = cached
+                SCHEMAS[database_id] = schema
+
+        if schema is not None and schema is not stale:
+            return schema
+
+        previous = schema or load_cache().get(database_id)
+
+        try:
+            schema = fetch_schema(api_key, database_id)
+        except RuntimeError as e:
+            # An expired copy is still a better guess than nothing.
+            if previous is None or stale is not None:
+                raise
+            print(f"Warning: could not refresh Notion schema, using cached copy: {e}")
+            SCHEMAS[database_id] = previous
+            return previous
+
+        if previous and previous.get("last_edited_time") != schema["last_edited_time"]:
+            print(f"Notion database schema changed since {previous.get('last_edited_time')}")
+
+        cache = load_cache()
+        cache[database_id] = schema
+        save_cache(cache)
+
+        SCHEMAS[database_id] = schema
+        print(f"Notion schema cached: {len(schema['properties'])} properties, title='{schema['title_property']}'")
+        return schema
+
+
+def remember_schema(database_id: str, schema: Dict[str, Any]) -> None:
+    """Use schema for database_id for the rest of this run without caching it on disk."""
+    with SCHEMAS_LOCK:
+        SCHEMAS[database_id] = schema
+
+
+def is_schema_error(error: Exception) -> bool:
+    if isinstance(error, SchemaMismatch):
+        return True
+
+    return isinstance(error, NotionAPIError) and error.status == 400 and error.code == "validation_error"
+
+
+def with_schema(api_key: str, database_id: str, call: Callable[[Dict[str, Any]], T]) -> T:
+    """
+    Run call with the cached schema. If Notion rejects the properties, or
+    call finds a property missing, the database has changed since it was
+    cached: refresh once and retry.
+    """
+    schema = get_schema(api_key, database_id)
+
+    try:
+        return call(schema)
+    except RuntimeError as e:
+        if not is_schema_error(e):
+            raise
+
+        print(f"Cached Notion schema is out of date, refreshing it: {e}")
+        return call(get_schema(api_key, database_id, stale=schema))
+
+
+def format_property(prop_type: str, value: Any) -> Optional[Dict[str, Any]]:
+    """Render a plain value as a property payload of prop_type, or None if unsupported."""
+    if prop_type in ("title", "rich_text"):
+        items = [{"text": {"content": str(value)}}] if value not in (None, "") else []
+        return {prop_type: items}
+
+    if prop_type in ("select", "status"):
+        return {prop_type: {"name": str(value)} if value not in (None, "") else None}
+
+    if prop_type == "number":
+        return {"number": value}
+
+    if prop_type == "url":
+        return {"url": value}
+
+    return None
+
+
+def build_properties(schema: Dict[str, Any], title: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a page properties payload for schema: the title goes to the
+    database's title property, and each value is written in the type its
+    property has. Values with no matching property, and status values that
+    are not one of the property's options, are left out.
+    """
+    properties_schema: Dict[str, str] = schema["properties"]
+    options: Dict[str, Any] = schema.get("options", {})
+    title_property = schema["title_property"]
+    properties: Dict[str, Any] = {title_property: format_property("title", title)}
+
+    for name, value in values.items():
+        prop_type = properties_schema.get(name)
+
+        if name == title_property or prop_type is None:
+            continue
+
+        if prop_type == "status" and value not in options.get(name, []):
+            print(f"[notion][WARN] '{value}' is not an option of status property '{name}', leaving it unset.")
+            continue
+
+        formatted = format_property(prop_type, value)
+        if formatted is not None:
+            properties[name] = formatted
+
+    return properties
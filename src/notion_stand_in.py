@@ -0,0 +1,364 @@
+import argparse
+import json
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import notion_schema
+from src.notion_http import TokenBucket
+
+
+# The property layout publish_to_notion writes to.
+DEFAULT_SCHEMA: Dict[str, str] = dict(notion_schema.DEFAULT_SCHEMA["properties"])
+
+Response = Tuple[int, Dict[str, str], Dict[str, Any]]
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def error(status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return status, headers or {}, {"object": "error", "status": status, "code": code, "message": message}
+
+
+def plain_text(items: List[Dict[str, Any]]) -> str:
+    return "".join(item.get("text", {}).get("content", "") for item in items)
+
+
+def stored_property(prop_type: str, value: Dict[str, Any]) -> Dict[str, Any]:
+    """Echo a written property back the way Notion returns it."""
+    if prop_type in ("title", "rich_text"):
+        items = value.get(prop_type, [])
+        return {
+            "type": prop_type,
+            prop_type: [
+                dict(item, type="text", plain_text=item.get("text", {}).get("content", ""))
+                for item in items
+            ],
+        }
+
+    return {"type": prop_type, prop_type: value.get(prop_type)}
+
+
+class NotionStandIn:
+    """
+    In-memory Notion API for the calls this pipeline makes: pages create,
+    update and retrieve, databases retrieve and query, search and block
+    children append.
+
+    Each integration token gets a token bucket of rate_limit requests per
+    second; requests beyond it get 429 rate_limited with Retry-After, as
+    Notion does. latency_ms is added to every request.
+    """
+
+    def __init__(
+        self,
+        database_id: str = "stand-in-database",
+        schema: Optional[Dict[str, str]] = None,
+        rate_limit: float = 3.0,
+        burst: float = 3.0,
+        latency_ms: float = 0.0,
+    ) -> None:
+        self.database_id = database_id
+        self.schema = dict(schema or DEFAULT_SCHEMA)
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.latency_ms = latency_ms
+        self.base_url = ""
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.pages: Dict[str, Dict[str, Any]] = {}
+            self.buckets: Dict[str, TokenBucket] = {}
+            self.stats: Counter = Counter()
+            self.database_edited_at = now_iso()
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] += 1
+
+    def set_schema(self, schema: Dict[str, str]) -> None:
+        with self.lock:
+            self.schema = dict(schema)
+            self.database_edited_at = now_iso()
+
+    def retry_after(self, token: str) -> Optional[int]:
+        """Take a request slot for token, or return the seconds to wait."""
+        if self.rate_limit <= 0:
+            return None
+
+        with self.lock:
+            bucket = self.buckets.get(token)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_limit, self.burst)
+                self.buckets[token] = bucket
+
+        wait = bucket.try_acquire()
+        return max(1, math.ceil(wait)) if wait else None
+
+    # --- database --------------------------------------------------------
+
+    def database(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "object": "database",
+                "id": self.database_id,
+                "title": [{"type": "text", "plain_text": "Weekly Packs", "text": {"content": "Weekly Packs"}}],
+                "last_edited_time": self.database_edited_at,
+                "properties": {
+                    name: {"id": uuid.uuid5(uuid.NAMESPACE_URL, name).hex[:4], "name": name, "type": prop_type, prop_type: {}}
+                    for name, prop_type in self.schema.items()
+                },
+            }
+
+    def check_properties(self, properties: Dict[str, Any]) -> Optional[Response]:
+        for name, value in properties.items():
+            prop_type = self.schema.get(name)
+
+            if prop_type is None:
+                return error(400, "validation_error", f"{name} is not a property that exists.")
+
+            if prop_type not in value:
+                return error(
+                    400,
+                    "validation_error",
+                    f"{name} is expected to be {prop_type}.",
+                )
+
+        return None
+
+    def matches(self, page: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+        if "and" in condition:
+            return all(self.matches(page, item) for item in condition["and"])
+
+        if "or" in condition:
+            return any(self.matches(page, item) for item in condition["or"])
+
+        prop = page["properties"].get(condition.get("property", ""), {})
+
+        if "number" in condition:
+            return prop.get("number") == condition["number"].get("equals")
+
+        for text_type in ("rich_text", "title"):
+            if text_type in condition:
+                return plain_text(prop.get(prop.get("type", text_type), [])) == condition[text_type].get("equals")
+
+        return False
+
+    def query(self, body: Dict[str, Any]) -> Response:
+        with self.lock:
+            pages = [page for page in self.pages.values() if not page["archived"]]
+
+        if body.get("filter"):
+            pages = [page for page in pages if self.matches(page, body["filter"])]
+
+        page_size = min(100, int(body.get("page_size", 100)))
+        start = int(body.get("start_cursor") or 0)
+        results = pages[start:start + page_size]
+        has_more = start + page_size < len(pages)
+
+        return 200, {}, {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None,
+        }
+
+    # --- pages -----------------------------------------------------------
+
+    def create_page(self, body: Dict[str, Any]) -> Response:
+        parent = body.get("parent", {})
+
+        if parent.get("database_id", "").replace("-", "") != self.database_id.replace("-", ""):
+            return error(404, "object_not_found", f"Could not find database with ID: {parent.get('database_id')}.")
+
+        properties = body.get("properties", {})
+        problem = self.check_properties(properties)
+        if problem:
+            return problem
+
+        page_id = str(uuid.uuid4())
+        timestamp = now_iso()
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": timestamp,
+            "last_edited_time": timestamp,
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": self.database_id},
+            "url": f"{self.base_url}/{page_id.replace('-', '')}",
+            "properties": {
+                name: stored_property(self.schema[name], value)
+                for name, value in properties.items()
+            },
+        }
+
+        with self.lock:
+            self.pages[page_id] = page
+
+        return 200, {}, page
+
+    def update_page(self, page_id: str, body: Dict[str, Any]) -> Response:
+        with self.lock:
+            page = self.pages.get(page_id)
+
+        if page is None:
+            return error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+
+        properties = body.get("properties", {})
+        problem = self.check_properties(properties)
+        if problem:
+            return problem
+
+        with self.lock:
+            for name, value in properties.items():
+                page["properties"][name] = stored_property(self.schema[name], value)
+            if "archived" in body:
+                page["archived"] = bool(body["archived"])
+            page["last_edited_time"] = now_iso()
+
+        return 200, {}, page
+
+    # --- routing ---------------------------------------------------------
+
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: Dict[str, Any]) -> Response:
+        token = headers.get("authorization", "")
+        parts = [part for part in path.split("?")[0].split("/") if part]
+
+        if parts[:1] == ["v1"]:
+            parts = parts[1:]
+
+        label = "/".join("{id}" if index == 1 else part for index, part in enumerate(parts))
+        self.count("requests")
+        self.count(f"{method} {label}")
+
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+        if not token.startswith("Bearer "):
+            return error(401, "unauthorized", "API token is invalid.")
+
+        wait = self.retry_after(token)
+        if wait is not None:
+            self.count("rate_limited")
+            return error(
+                429,
+                "rate_limited",
+                "You have been rate limited. Please try again in a few minutes.",
+                {"Retry-After": str(wait)},
+            )
+
+        if parts == ["pages"] and method == "POST":
+            return self.create_page(body)
+
+        if len(parts) == 2 and parts[0] == "pages":
+            if method == "PATCH":
+                return self.update_page(parts[1], body)
+            if method == "GET":
+                with self.lock:
+                    page = self.pages.get(parts[1])
+                return (200, {}, page) if page else error(404, "object_not_found", "Could not find page.")
+
+        if len(parts) >= 2 and parts[0] == "databases":
+            if parts[1].replace("-", "") != self.database_id.replace("-", ""):
+                return error(404, "object_not_found", f"Could not find database with ID: {parts[1]}.")
+            if len(parts) == 2 and method == "GET":
+                return 200, {}, self.database()
+            if parts[2:] == ["query"] and method == "POST":
+                return self.query(body)
+
+        if parts == ["search"] and method == "POST":
+            return 200, {}, {"object": "list", "results": [self.database()], "has_more": False, "next_cursor": None}
+
+        if len(parts) == 3 and parts[0] == "blocks" and parts[2] == "children" and method == "PATCH":
+            return 200, {}, {"object": "list", "results": body.get("children", []), "has_more": False}
+
+        return error(400, "invalid_request_url", f"Invalid request URL: {method} {path}")
+
+
+def make_handler(notion: NotionStandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_request(self) -> None:
+            length = int(self.headers.get("Content-Length", "0") or "0")
+            raw = self.rfile.read(length) if length else b""
+            headers = {key.lower(): value for key, value in self.headers.items()}
+
+            try:
+                body = json.loads(raw or b"{}")
+            except json.JSONDecodeError:
+                status, response_headers, data = error(400, "invalid_json", "Error parsing JSON body.")
+            else:
+                status, response_headers, data = notion.handle(self.command, self.path, headers, body)
+
+            payload = json.dumps(data).encode("utf-8")
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            for key, value in response_headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PATCH = do_request
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def start_server(notion: NotionStandIn, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(notion))
+    server.daemon_threads = True
+    notion.base_url = f"http://{host}:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local Notion API stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--database-id", default="stand-in-database")
+    parser.add_argument("--rate-limit", type=float, default=3.0)
+    parser.add_argument("--burst", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    notion = NotionStandIn(
+        database_id=args.database_id,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        latency_ms=args.latency_ms,
+    )
+    server = start_server(notion, args.host, args.port)
+
+    print(f"Notion stand-in listening on {notion.base_url}")
+    print(f"Set NOTION_API_URL={notion.base_url}/v1 and NOTION_DATABASE_ID={args.database_id}")
+
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
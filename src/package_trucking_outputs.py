@@ -1,9 +1,13 @@
+import hashlib
 import json
 import os
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
+
+from src.concurrency import worker_count
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -22,6 +26,23 @@ EXPECTED_FILES = [
 ]
 
 
+# These formats are already compressed internally (ReportLab deflates PDF
+# streams), so running DEFLATE over them again costs CPU for almost no gain.
+STORED_SUFFIXES = {
+    ".pdf",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".zip",
+}
+
+DEFAULT_DEFLATE_LEVEL = 6
+
+# Fixed entry metadata so identical inputs always produce identical zip bytes.
+ZIP_ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_ENTRY_MODE = 0o100644
+
+
 def find_week_dir() -> Path:
     week_key = os.getenv("WEEK_KEY", "").strip()
 
@@ -52,7 +73,138 @@ def read_meta(client_dir: Path) -> Dict[str, str]:
         return json.load(f)
 
 
-def zip_client_folder(client_dir: Path, packages_dir: Path, week_key: str) -> Dict[str, str]:
+def get_deflate_level() -> int:
+    value = os.getenv("PACKAGE_DEFLATE_LEVEL", "").strip()
+
+    if not value:
+        return DEFAULT_DEFLATE_LEVEL
+
+    try:
+        return min(9, max(0, int(value)))
+    except ValueError:
+        return DEFAULT_DEFLATE_LEVEL
+
+
+def compression_for(file_path: Path) -> int:
+    if file_path.suffix.lower() in STORED_SUFFIXES:
+        return zipfile.ZIP_STORED
+
+    return zipfile.ZIP_DEFLATED
+
+
+def summarize_compression(zip_path: Path) -> Dict[str, Dict[str, Any]]:
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        for info in zf.infolist():
+            suffix = Path(info.filename).suffix.lower() or "(none)"
+            entry = stats.setdefault(
+                suffix,
+                {
+                    "file_count": 0,
+                    "original_bytes": 0,
+                    "compressed_bytes": 0,
+                    "method": "stored" if info.compress_type == zipfile.ZIP_STORED else "deflated",
+                },
+            )
+            entry["file_count"] += 1
+            entry["original_bytes"] += info.file_size
+            entry["compressed_bytes"] += info.compress_size
+
+    for entry in stats.values():
+        original = entry["original_bytes"]
+        entry["ratio"] = round(entry["compressed_bytes"] / original, 4) if original else 1.0
+
+    return stats
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def load_previous_records(week_dir: Path) -> Dict[str, Dict[str, Any]]:
+    index_path = week_dir / "master_index.json"
+
+    if not index_path.exists():
+        return {}
+
+    try:
+        with index_path.open("r", encoding="utf-8") as f:
+            master_index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    return {
+        record["client_id"]: record
+        for record in master_index.get("clients", [])
+        if record.get("client_id")
+    }
+
+
+def is_package_unchanged(
+    previous_record: Optional[Dict[str, Any]],
+    zip_path: Path,
+    input_sha256: Dict[str, str],
+    deflate_level: int,
+) -> bool:
+    """
+    True when the existing zip was built from the same inputs with the same
+    compression settings and is still byte-for-byte the zip recorded then.
+    """
+    if not previous_record:
+        return False
+
+    if previous_record.get("input_sha256") != input_sha256:
+        return False
+
+    if previous_record.get("deflate_level") != deflate_level:
+        return False
+
+    if previous_record.get("stored_suffixes") != sorted(STORED_SUFFIXES):
+        return False
+
+    if not zip_path.exists():
+        return False
+
+    if zip_path.stat().st_size != previous_record.get("package_size_bytes"):
+        return False
+
+    return sha256_file(zip_path) == previous_record.get("package_sha256")
+
+
+def write_deterministic_zip(zip_path: Path, included_files: List[Path], deflate_level: int) -> None:
+    tmp_path = zip_path.with_name(zip_path.name + ".tmp")
+
+    with zipfile.ZipFile(tmp_path, "w") as zf:
+        for file_path in sorted(included_files, key=lambda p: p.name):
+            compress_type = compression_for(file_path)
+
+            info = zipfile.ZipInfo(file_path.name, date_time=ZIP_ENTRY_DATE_TIME)
+            info.compress_type = compress_type
+            info.create_system = 3
+            info.external_attr = ZIP_ENTRY_MODE << 16
+
+            zf.writestr(
+                info,
+                file_path.read_bytes(),
+                compresslevel=deflate_level if compress_type == zipfile.ZIP_DEFLATED else None,
+            )
+
+    os.replace(tmp_path, zip_path)
+
+
+def zip_client_folder(
+    client_dir: Path,
+    packages_dir: Path,
+    week_key: str,
+    previous_records: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     meta = read_meta(client_dir)
 
     client_id = meta.get("client_id") or client_dir.name
@@ -72,11 +224,25 @@ def zip_client_folder(client_dir: Path, packages_dir: Path, week_key: str) -> Di
     if not included_files:
         raise RuntimeError(f"No expected files found for client folder: {client_dir}")
 
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for file_path in included_files:
-            zf.write(file_path, arcname=file_path.name)
+    deflate_level = get_deflate_level()
+    input_sha256 = {
+        file_path.name: sha256_file(file_path)
+        for file_path in sorted(included_files, key=lambda p: p.name)
+    }
+
+    previous_record = (previous_records or {}).get(client_id)
 
-    print(f"Packaged {company_name}: {zip_path}")
+    if is_package_unchanged(previous_record, zip_path, input_sha256, deflate_level):
+        package_status = "unchanged"
+        package_sha256 = previous_record["package_sha256"]
+        compression = previous_record.get("compression") or summarize_compression(zip_path)
+        print(f"Package unchanged for {company_name}: {zip_path}")
+    else:
+        package_status = "updated" if zip_path.exists() else "new"
+        write_deterministic_zip(zip_path, included_files, deflate_level)
+        package_sha256 = sha256_file(zip_path)
+        compression = summarize_compression(zip_path)
+        print(f"Packaged {company_name}: {zip_path}")
 
     return {
         "client_id": client_id,
@@ -86,13 +252,50 @@ def zip_client_folder(client_dir: Path, packages_dir: Path, week_key: str) -> Di
         "pdf": f"{client_dir.name}/full_pack.pdf",
         "markdown": f"{client_dir.name}/full_pack.md",
         "meta": f"{client_dir.name}/meta.json",
+        "package_status": package_status,
+        "package_sha256": package_sha256,
+        "package_size_bytes": zip_path.stat().st_size,
+        "input_sha256": input_sha256,
+        "deflate_level": deflate_level,
+        "stored_suffixes": sorted(STORED_SUFFIXES),
+        "compression": compression,
     }
 
 
+def package_clients(
+    client_dirs: List[Path],
+    packages_dir: Path,
+    week_key: str,
+    previous_records: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    workers = worker_count("PACKAGE_WORKERS", None, len(client_dirs))
+
+    if workers == 1:
+        return [
+            zip_client_folder(client_dir, packages_dir, week_key, previous_records)
+            for client_dir in client_dirs
+        ]
+
+    # zlib releases the GIL while compressing, so threads scale across cores.
+    # executor.map keeps records in client_dirs order.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                lambda client_dir: zip_client_folder(
+                    client_dir,
+                    packages_dir,
+                    week_key,
+                    previous_records,
+                ),
+                client_dirs,
+            )
+        )
+
+
 def build_run_summary(
     week_dir: Path,
     packages_dir: Path,
-    package_records: List[Dict[str, str]],
+    package_records: List[Dict[str, Any]],
 ) -> None:
     week_key = week_dir.name
     generated_at = datetime.now(timezone.utc).isoformat()
@@ -128,9 +331,53 @@ def build_run_summary(
     print(f"Wrote run summary: {summary_path}")
 
 
+def build_compression_report(
+    week_dir: Path,
+    packages_dir: Path,
+    package_records: List[Dict[str, Any]],
+) -> None:
+    by_file_type: Dict[str, Dict[str, Any]] = {}
+
+    for record in package_records:
+        for suffix, stats in record.get("compression", {}).items():
+            entry = by_file_type.setdefault(
+                suffix,
+                {
+                    "file_count": 0,
+                    "original_bytes": 0,
+                    "compressed_bytes": 0,
+                    "method": stats["method"],
+                },
+            )
+            entry["file_count"] += stats["file_count"]
+            entry["original_bytes"] += stats["original_bytes"]
+            entry["compressed_bytes"] += stats["compressed_bytes"]
+
+    for entry in by_file_type.values():
+        original = entry["original_bytes"]
+        entry["ratio"] = round(entry["compressed_bytes"] / original, 4) if original else 1.0
+
+    report = {
+        "week": week_dir.name,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "deflate_level": get_deflate_level(),
+        "stored_suffixes": sorted(STORED_SUFFIXES),
+        "by_file_type": dict(sorted(by_file_type.items())),
+        "clients": {
+            record["client_id"]: record.get("compression", {})
+            for record in sorted(package_records, key=lambda r: r["client_id"])
+        },
+    }
+
+    report_path = packages_dir / "compression_report.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(f"Wrote compression report: {report_path}")
+
+
 def build_master_index(
     week_dir: Path,
-    package_records: List[Dict[str, str]],
+    package_records: List[Dict[str, Any]],
 ) -> None:
     week_key = week_dir.name
 
@@ -138,6 +385,9 @@ def build_master_index(
         "week": week_key,
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "client_count": len(package_records),
+        "unchanged_package_count": sum(
+            1 for record in package_records if record.get("package_status") == "unchanged"
+        ),
         "clients": sorted(package_records, key=lambda r: r["client_id"]),
     }
 
@@ -166,12 +416,14 @@ def main() -> None:
     if not client_dirs:
         raise RuntimeError(f"No client output folders found in: {week_dir}")
 
-    package_records = []
+    previous_records = load_previous_records(week_dir)
 
-    for client_dir in sorted(client_dirs, key=lambda p: p.name):
-        package_records.append(
-            zip_client_folder(client_dir, packages_dir, week_key)
-        )
+    package_records = package_clients(
+        sorted(client_dirs, key=lambda p: p.name),
+        packages_dir,
+        week_key,
+        previous_records,
+    )
 
     build_run_summary(
         week_dir,
@@ -179,6 +431,12 @@ def main() -> None:
         package_records,
     )
 
+    build_compression_report(
+        week_dir,
+        packages_dir,
+        package_records,
+    )
+
     build_master_index(
         week_dir,
         package_records,
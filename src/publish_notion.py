@@ -1,9 +1,11 @@
 import os, json, yaml
 from pathlib import Path
-from notion_client import Client
+from src.notion_http import notion_json
+from src import notion_schema
 
 def latest_out_dir() -> Path:
-    return sorted(Path("output").glob("*"))[-1]
+    # output/ also holds run-wide files such as the Notion schema cache.
+    return sorted(p for p in Path("output").glob("*") if p.is_dir())[-1]
 
 def build_links(out_dir: Path) -> dict:
     dl = out_dir / "drive_links.json"
@@ -18,34 +20,8 @@ def build_links(out_dir: Path) -> dict:
     md_url  = f"https://raw.githubusercontent.com/{repo}/main/packs/{folder}/{meta['md_name']}"
     return {"pdf": pdf_url, "md": md_url}
 
-def get_db_schema(notion: Client, db_id: str):
-    return notion.databases.retrieve(db_id)
-
-# ---------- TITLE PROPERTY DETECTION (NEW SAFE VERSION) ----------
-def find_title_prop_name(db_schema: dict) -> str:
-    """
-    Try to find the Notion title property with fallbacks:
-      1. Find property with type='title'
-      2. If not found, just assume column is named 'Name'
-    We also print out the available properties for debugging.
-    """
-    props = db_schema.get("properties", {})
-    print(f"[notion] Available properties: {list(props.keys())}")
-
-    # Normal case — real Notion title property
-    for prop_name, prop in props.items():
-        if prop.get("type") == "title":
-            print(f"[notion] Found real title property: '{prop_name}'")
-            return prop_name
-
-    # Fallback — assume default 'Name' column
-    print("[notion][WARN] No 'title'-type property found. "
-          "Falling back to property name 'Name'.")
-    return "Name"
-# -----------------------------------------------------------------
-
 def main():
-    notion = Client(auth=os.environ["NOTION_API_KEY"])
+    api_key = os.environ["NOTION_API_KEY"]
     db_id  = os.environ["NOTION_DATABASE_ID"]
     hub_id = os.environ["NOTION_MEMBERS_PAGE_ID"]
 
@@ -70,21 +46,22 @@ def main():
     year = int(year_str)
     week = int(week_str)
 
-    # --- Notion database schema
-    db_schema = get_db_schema(notion, db_id)
-    print(f"[notion] Retrieved database: {db_schema.get('title')}")
-    title_prop = find_title_prop_name(db_schema)
-    print(f"[notion] Using title property: '{title_prop}'")
+    # --- Notion database schema (cached under output/, retrieved again when Notion rejects it)
+    db_schema = notion_schema.get_schema(api_key, db_id)
+    print(f"[notion] Database: {db_schema.get('title')} (edited {db_schema.get('last_edited_time')})")
+    print(f"[notion] Available properties: {list(db_schema['properties'].keys())}")
+    print(f"[notion] Using title property: '{db_schema['title_property']}'")
+
+    # Status/Week/Year go in with the title when the database has them,
+    # instead of a follow-up PATCH. A status-type Status is only set when
+    # "Published" is one of its cached options, so it cannot fail the create.
+    values = {"Status": "Published", "Week": week, "Year": year}
 
     # --- 1) Create page in database
-    page = notion.pages.create(
-        parent={"database_id": db_id},
-        properties={
-            title_prop: {
-                "title": [{"text": {"content": title}}]
-            }
-        },
-        children=[
+    page = notion_schema.with_schema(api_key, db_id, lambda schema: notion_json(api_key, "POST", "pages", {
+        "parent": {"database_id": db_id},
+        "properties": notion_schema.build_properties(schema, title, values),
+        "children": [
             {
                 "object": "block",
                 "type": "paragraph",
@@ -95,31 +72,12 @@ def main():
                 }
             }
         ]
-    )
+    }))
 
     page_id = page["id"]
-    print(f"[notion] Created page {page_id}")
-
-    # --- 2) Optional property updates
-    db_props = db_schema.get("properties", {})
-    update_props = {}
-
-    if "Status" in db_props and db_props["Status"].get("type") == "select":
-        update_props["Status"] = {"select": {"name": "Published"}}
-
-    if "Week" in db_props and db_props["Week"].get("type") == "number":
-        update_props["Week"] = {"number": week}
-
-    if "Year" in db_props and db_props["Year"].get("type") == "number":
-        update_props["Year"] = {"number": year}
-
-    if update_props:
-        notion.pages.update(page_id=page_id, properties=update_props)
-        print(f"[notion] Updated: {list(update_props.keys())}")
-    else:
-        print("[notion] No Status/Week/Year fields to update.")
+    print(f"[notion] Created page {page_id} with: {list(page.get('properties', {}).keys())}")
 
-    # --- 3) Append links to Members Hub
+    # --- 2) Append links to Members Hub
     blocks = [
         {
             "object": "block",
@@ -148,7 +106,7 @@ def main():
         }
     ]
 
-    notion.blocks.children.append(block_id=hub_id, children=blocks)
+    notion_json(api_key, "PATCH", f"blocks/{hub_id}/children", {"children": blocks})
 
     print(f"[OK] Notion updated. PDF: {links['pdf']} | MD: {links['md']}")
 
@@ -1,16 +1,23 @@
-import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+from src import manifest_store, notion_http, notion_schema, retry_queue
+from src.concurrency import worker_count
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
 
-NOTION_VERSION = "2022-06-28"
+DEFAULT_PUBLISH_WORKERS = 4
+
+# (client_id, week) -> existing Notion page for that client and week.
+PageIndex = Dict[Tuple[str, str], Dict[str, Any]]
 
 
 def find_week_dir() -> Path:
@@ -30,25 +37,11 @@ def find_week_dir() -> Path:
 
 
 def load_manifest(week_dir: Path) -> Dict[str, Any]:
-    manifest_path = week_dir / "distribution_manifest.json"
-
-    if not manifest_path.exists():
-        raise RuntimeError(f"Missing distribution manifest: {manifest_path}")
-
-    with manifest_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return manifest_store.load_manifest(week_dir)
 
 
 def save_manifest(week_dir: Path, manifest: Dict[str, Any]) -> None:
-    manifest_path = week_dir / "distribution_manifest.json"
-
-    manifest["last_updated_at"] = datetime.now(timezone.utc).isoformat()
-
-    manifest_path.write_text(
-        json.dumps(manifest, indent=2),
-        encoding="utf-8",
-    )
-
+    manifest_path = manifest_store.save_manifest(week_dir, manifest, stage="notion_publish")
     print(f"Saved manifest: {manifest_path}")
 
 
@@ -75,14 +68,6 @@ def publish_mock(client: Dict[str, Any], week: str) -> None:
     client["error"] = None
 
 
-def notion_headers(api_key: str) -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "Notion-Version": NOTION_VERSION,
-    }
-
-
 def build_drive_folder_url(client: Dict[str, Any]) -> Optional[str]:
     folder_id = client.get("drive_client_folder_id")
 
@@ -92,78 +77,170 @@ def build_drive_folder_url(client: Dict[str, Any]) -> Optional[str]:
     return f"https://drive.google.com/drive/folders/{folder_id}"
 
 
+def parse_week(week: str) -> Tuple[int, int]:
+    year, week_number = week.split("-W")
+    return int(year), int(week_number)
+
+
+def build_page_values(week: str, client: Dict[str, Any]) -> Dict[str, Any]:
+    year, week_number = parse_week(week)
+
+    return {
+        "Status": "Published",
+        "Week": week_number,
+        "Year": year,
+        "Client ID": client["client_id"],
+        "PDF URL": client.get("drive_pdf_url"),
+        "ZIP URL": client.get("drive_zip_url"),
+        "Markdown URL": client.get("drive_markdown_url"),
+        "Drive Folder": build_drive_folder_url(client),
+    }
+
+
+def build_page_properties(
+    week: str,
+    client: Dict[str, Any],
+    schema: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build the page properties for the database schema: the title goes to
+    its title property, and values are written in each property's type.
+    Properties the database does not have are left out.
+    """
+    return notion_schema.build_properties(
+        schema or notion_schema.DEFAULT_SCHEMA,
+        f"{client['company_name']} - {week}",
+        build_page_values(week, client),
+    )
+
+
+def read_client_id(page: Dict[str, Any]) -> Optional[str]:
+    prop = page.get("properties", {}).get("Client ID", {})
+    text = "".join(
+        item.get("plain_text") or item.get("text", {}).get("content", "")
+        for item in prop.get(prop.get("type", "rich_text"), [])
+    )
+    return text or None
+
+
+def build_page_index(
+    api_key: str,
+    database_id: str,
+    week: str,
+    schema: Optional[Dict[str, Any]] = None,
+) -> PageIndex:
+    """
+    Map (client_id, week) to the existing page for every client already
+    published this week, using one paginated, Week/Year-filtered query
+    instead of a lookup per client.
+    """
+    if schema is not None:
+        properties = schema["properties"]
+        if properties.get("Week") != "number" or properties.get("Year") != "number":
+            raise notion_schema.SchemaMismatch("Notion database has no number properties Week and Year to filter on")
+        if properties.get("Client ID") not in ("rich_text", "title"):
+            raise notion_schema.SchemaMismatch("Notion database has no text property Client ID")
+
+    year, week_number = parse_week(week)
+
+    query: Dict[str, Any] = {
+        "filter": {
+            "and": [
+                {"property": "Week", "number": {"equals": week_number}},
+                {"property": "Year", "number": {"equals": year}},
+            ]
+        },
+        "page_size": 100,
+    }
+
+    page_index: PageIndex = {}
+    duplicate_count = 0
+
+    while True:
+        response = notion_http.notion_json(api_key, "POST", f"databases/{database_id}/query", query)
+
+        for page in response.get("results", []):
+            client_id = read_client_id(page)
+            if not client_id or page.get("archived"):
+                continue
+
+            # Reruns before this index existed may have left duplicates;
+            # keep updating the first one Notion returns.
+            if (client_id, week) in page_index:
+                duplicate_count += 1
+                continue
+
+            page_index[(client_id, week)] = page
+
+        if not response.get("has_more"):
+            break
+
+        query["start_cursor"] = response["next_cursor"]
+
+    print(f"Notion page index: {len(page_index)} existing pages for {week}")
+
+    if duplicate_count:
+        print(f"Warning: {duplicate_count} duplicate Notion pages found for {week}")
+
+    return page_index
+
+
 def create_notion_page(
     api_key: str,
     database_id: str,
     week: str,
     client: Dict[str, Any],
+    schema: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
 
-    year = int(week.split("-W")[0])
-    week_number = int(week.split("-W")[1])
-
     payload = {
         "parent": {
             "database_id": database_id,
         },
-        "properties": {
-            "Name": {
-                "title": [
-                    {
-                        "text": {
-                            "content": f"{client['company_name']} - {week}"
-                        }
-                    }
-                ]
-            },
-            "Status": {
-                "select": {
-                    "name": "Published"
-                }
-            },
-            "Week": {
-                "number": week_number
-            },
-            "Year": {
-                "number": year
-            },
-            "Client ID": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": client["client_id"]
-                        }
-                    }
-                ]
-            },
-            "PDF URL": {
-                "url": client.get("drive_pdf_url")
-            },
-            "ZIP URL": {
-                "url": client.get("drive_zip_url")
-            },
-            "Markdown URL": {
-                "url": client.get("drive_markdown_url")
-            },
-            "Drive Folder": {
-                "url": build_drive_folder_url(client)
-            },
-        },
+        "properties": build_page_properties(week, client, schema),
     }
 
-    response = requests.post(
-        "https://api.notion.com/v1/pages",
-        headers=notion_headers(api_key),
-        json=payload,
-        timeout=30,
-    )
+    retries = notion_http.get_env_int("NOTION_HTTP_RETRIES", notion_http.DEFAULT_RETRIES)
+    attempt = 0
 
-    if not response.ok:
-        raise RuntimeError(
-            f"Notion API error {response.status_code}: {response.text}"
-        )
+    # notion_request only retries a create on 429s and failed connects. A
+    # 5xx or timeout may arrive after Notion made the page, so look for it
+    # before sending the create again.
+    while True:
+        try:
+            return notion_http.notion_json(api_key, "POST", "pages", payload)
+        except notion_http.NotionAPIError as e:
+            if e.status < 500 or attempt >= retries:
+                raise
+            failure: Exception = e
+        except requests.RequestException as e:
+            if attempt >= retries:
+                raise
+            failure = e
 
-    return response.json()
+        print(f"Notion page create for {client['client_id']} may have gone through, checking before retrying: {failure}")
+
+        time.sleep(notion_http.retry_delay(None, attempt))
+        attempt += 1
+
+        existing = build_page_index(api_key, database_id, week, schema).get((client["client_id"], week))
+        if existing:
+            return existing
+
+
+def update_notion_page(
+    api_key: str,
+    page_id: str,
+    week: str,
+    client: Dict[str, Any],
+    schema: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+
+    payload = {
+        "properties": build_page_properties(week, client, schema),
+    }
+
+    return notion_http.notion_json(api_key, "PATCH", f"pages/{page_id}", payload)
 
 
 def publish_real(
@@ -171,14 +248,30 @@ def publish_real(
     week: str,
     api_key: str,
     database_id: str,
+    page_index: Optional[PageIndex] = None,
 ) -> None:
 
-    result = create_notion_page(
-        api_key,
-        database_id,
-        week,
-        client,
-    )
+    existing = page_index.get((client["client_id"], week)) if page_index is not None else None
+
+    # The schema comes from the cache shared by every client; it is only
+    # retrieved again if Notion rejects the properties built from it.
+    if existing:
+        result = notion_schema.with_schema(
+            api_key,
+            database_id,
+            lambda schema: update_notion_page(api_key, existing["id"], week, client, schema),
+        )
+        client["notion_publish_action"] = "updated"
+    else:
+        result = notion_schema.with_schema(
+            api_key,
+            database_id,
+            lambda schema: create_notion_page(api_key, database_id, week, client, schema),
+        )
+        client["notion_publish_action"] = "created"
+
+        if page_index is not None:
+            page_index[(client["client_id"], week)] = result
 
     client["notion_url"] = result.get("url")
     client["notion_page_id"] = result.get("id")
@@ -195,6 +288,7 @@ def process_client(
     use_real_notion: bool,
     api_key: Optional[str] = None,
     database_id: Optional[str] = None,
+    page_index: Optional[PageIndex] = None,
 ) -> bool:
 
     client_id = client.get("client_id")
@@ -219,6 +313,7 @@ def process_client(
                 week,
                 api_key,
                 database_id,
+                page_index,
             )
         else:
             publish_mock(client, week)
@@ -236,6 +331,38 @@ def process_client(
         return True
 
 
+def publish_clients(
+    clients: List[Dict[str, Any]],
+    week: str,
+    use_real_notion: bool,
+    api_key: Optional[str] = None,
+    database_id: Optional[str] = None,
+    workers: Optional[int] = None,
+    page_index: Optional[PageIndex] = None,
+) -> List[bool]:
+    def run_client(client: Dict[str, Any]) -> bool:
+        return process_client(
+            client,
+            week,
+            use_real_notion,
+            api_key=api_key,
+            database_id=database_id,
+            page_index=page_index,
+        )
+
+    if workers is None:
+        workers = worker_count("NOTION_PUBLISH_WORKERS", DEFAULT_PUBLISH_WORKERS, len(clients)) if use_real_notion else 1
+
+    if workers == 1:
+        return [run_client(client) for client in clients]
+
+    # The shared token bucket in notion_http paces the workers at the
+    # integration's rate limit; the extra threads only hide latency.
+    print(f"Notion publish workers: {workers}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_client, clients))
+
+
 def main() -> None:
     week_dir = find_week_dir()
     week = week_dir.name
@@ -258,20 +385,41 @@ def main() -> None:
     published_count = 0
     failed_count = 0
 
-    for client in clients:
-        before = json.dumps(client, sort_keys=True)
+    requests_before = notion_http.RATE_LIMITER.acquired
+    started = time.perf_counter()
 
-        changed = process_client(
-            client,
-            week,
-            use_real_notion,
-            api_key=api_key,
-            database_id=database_id,
-        )
+    page_index: Optional[PageIndex] = None
 
-        after = json.dumps(client, sort_keys=True)
+    if use_real_notion and any(client.get("delivery_status") == "uploaded" for client in clients):
+        try:
+            notion_schema.get_schema(api_key, database_id)
+        except Exception as e:
+            print(f"Warning: could not read the Notion database schema, using the default layout: {e}")
+            notion_schema.remember_schema(database_id, notion_schema.DEFAULT_SCHEMA)
 
-        if changed and before != after:
+        try:
+            page_index = notion_schema.with_schema(
+                api_key,
+                database_id,
+                lambda schema: build_page_index(api_key, database_id, week, schema),
+            )
+        except Exception as e:
+            print(f"Warning: could not index existing Notion pages, creating new ones: {e}")
+
+    results = publish_clients(
+        clients,
+        week,
+        use_real_notion,
+        api_key=api_key,
+        database_id=database_id,
+        page_index=page_index,
+    )
+
+    seconds = time.perf_counter() - started
+    request_count = notion_http.RATE_LIMITER.acquired - requests_before
+
+    for client, changed in zip(clients, results):
+        if changed and manifest_store.client_changed(client):
             changed_count += 1
 
         if client.get("delivery_status") == "published":
@@ -280,6 +428,17 @@ def main() -> None:
         if client.get("delivery_status") == "publish_failed":
             failed_count += 1
 
+    if use_real_notion:
+        retry_queue.record_outcomes(
+            "notion",
+            week,
+            [
+                (client["client_id"], client.get("delivery_status") == "published", None, client.get("error"))
+                for client, changed in zip(clients, results)
+                if changed
+            ],
+        )
+
     manifest["notion_publish_completed_at"] = (
         datetime.now(timezone.utc).isoformat()
     )
@@ -291,11 +450,19 @@ def main() -> None:
     manifest["notion_published_client_count"] = published_count
     manifest["notion_publish_failed_client_count"] = failed_count
     manifest["notion_publish_changed_client_count"] = changed_count
+    manifest["notion_publish_seconds"] = round(seconds, 3)
+    manifest["notion_publish_request_count"] = request_count
 
     save_manifest(week_dir, manifest)
 
     print(f"Notion published clients: {published_count}")
     print(f"Notion failed clients: {failed_count}")
+
+    if request_count:
+        print(
+            f"Notion throughput: {request_count} requests in {seconds:.2f}s "
+            f"({request_count / seconds:.2f}/s, limit {notion_http.RATE_LIMITER.rate:g}/s)"
+        )
     print(f"Changed client records: {changed_count}")
 
 
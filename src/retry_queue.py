@@ -0,0 +1,271 @@
+import os
+import random
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+OUTPUT_DIR = ROOT_DIR / "output"
+
+# Kept next to run_history.jsonl so queued retries survive between runs.
+QUEUE_DB_PATH = OUTPUT_DIR / "retry_queue.sqlite3"
+
+KINDS = ("notion", "webhook", "email")
+
+PENDING = "pending"
+DEAD = "dead"
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+DEFAULT_BASE_SECONDS = 30.0
+DEFAULT_MAX_DELAY_SECONDS = 1800.0
+DEFAULT_MAX_ATTEMPTS = 6
+
+# HTTP statuses worth retrying; every other 4xx means the request itself
+# is wrong and will fail the same way again.
+TRANSIENT_HTTP_STATUSES = {408, 409, 425, 429}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS retry_items (
+    item_key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    week TEXT NOT NULL,
+    client_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error_class TEXT NOT NULL,
+    status_code INTEGER,
+    last_error TEXT,
+    first_failed_at TEXT NOT NULL,
+    last_attempt_at TEXT NOT NULL,
+    next_attempt_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS retry_items_due ON retry_items (status, next_attempt_at);
+"""
+
+# (client_id, ok, status_code, error) for one delivery attempt.
+Outcome = Tuple[str, bool, Optional[int], Optional[str]]
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def iso(value: datetime) -> str:
+    # Fixed-width timestamps, so SQLite can compare them as text.
+    return value.isoformat(timespec="microseconds")
+
+
+def get_env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "").strip()
+
+    if not value:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return default
+
+
+def get_max_attempts() -> int:
+    return max(1, int(get_env_float("RETRY_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)))
+
+
+def backoff_seconds(attempts: int) -> float:
+    """
+    Exponential backoff with jitter: the delay doubles from
+    RETRY_BASE_SECONDS up to RETRY_MAX_DELAY_SECONDS, and a random half of
+    it is dropped so retries for many clients do not arrive together.
+    """
+    base = get_env_float("RETRY_BASE_SECONDS", DEFAULT_BASE_SECONDS)
+    cap = get_env_float("RETRY_MAX_DELAY_SECONDS", DEFAULT_MAX_DELAY_SECONDS)
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def parse_status_code(kind: str, error: Optional[str]) -> Optional[int]:
+    if not error:
+        return None
+
+    if kind == "notion":
+        match = re.search(r"Notion API error (\d{3})", error)
+    elif kind == "email":
+        # smtplib errors read "(code, b'message')".
+        match = re.match(r"\((\d{3}),", error)
+    else:
+        match = None
+
+    return int(match.group(1)) if match else None
+
+
+def classify_error(kind: str, status_code: Optional[int], error: Optional[str]) -> str:
+    if status_code is None:
+        status_code = parse_status_code(kind, error)
+
+    # No status at all: a timeout, refused connection or dropped socket.
+    if status_code is None:
+        return TRANSIENT
+
+    if kind == "email":
+        # SMTP 4xx replies are temporary by definition, 5xx are not.
+        return TRANSIENT if 400 <= status_code < 500 else PERMANENT
+
+    if status_code >= 500 or status_code in TRANSIENT_HTTP_STATUSES:
+        return TRANSIENT
+
+    return PERMANENT
+
+
+def item_key(kind: str, week: str, client_id: str) -> str:
+    return f"{kind}:{week}:{client_id}"
+
+
+@contextmanager
+def transaction(db_path: Optional[Path] = None) -> Iterator[sqlite3.Connection]:
+    path = db_path or QUEUE_DB_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def get_item(conn: sqlite3.Connection, kind: str, week: str, client_id: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        "SELECT * FROM retry_items WHERE item_key = ?",
+        (item_key(kind, week, client_id),),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def record_failure(
+    conn: sqlite3.Connection,
+    kind: str,
+    week: str,
+    client_id: str,
+    error: Optional[str],
+    status_code: Optional[int] = None,
+    error_class: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Count one more failed attempt for this delivery and schedule the next.
+    Permanent errors, and deliveries out of attempts, are kept as dead
+    items for an operator instead of being retried. error_class overrides
+    the class classify_error would give.
+    """
+    existing = get_item(conn, kind, week, client_id)
+    now = now_utc()
+
+    attempts = (existing["attempts"] if existing else 0) + 1
+    error_class = error_class or classify_error(kind, status_code, error)
+    dead = error_class == PERMANENT or attempts >= get_max_attempts()
+
+    item = {
+        "item_key": item_key(kind, week, client_id),
+        "kind": kind,
+        "week": week,
+        "client_id": client_id,
+        "status": DEAD if dead else PENDING,
+        "attempts": attempts,
+        "error_class": error_class,
+        "status_code": status_code if status_code is not None else parse_status_code(kind, error),
+        "last_error": (error or "")[:1000],
+        "first_failed_at": existing["first_failed_at"] if existing else iso(now),
+        "last_attempt_at": iso(now),
+        "next_attempt_at": None if dead else iso(now + timedelta(seconds=backoff_seconds(attempts))),
+    }
+
+    conn.execute(
+        f"INSERT OR REPLACE INTO retry_items ({', '.join(item)}) VALUES ({', '.join('?' * len(item))})",
+        tuple(item.values()),
+    )
+    return item
+
+
+def schedule_now(conn: sqlite3.Connection, kind: str, week: str, client_id: str, reason: str) -> None:
+    """Queue a delivery that has not failed yet but is due immediately."""
+    if get_item(conn, kind, week, client_id):
+        return
+
+    now = iso(now_utc())
+    conn.execute(
+        """
+        INSERT INTO retry_items (
+            item_key, kind, week, client_id, status, attempts, error_class,
+            status_code, last_error, first_failed_at, last_attempt_at, next_attempt_at
+        ) VALUES (?, ?, ?, ?, ?, 0, ?, NULL, ?, ?, ?, ?)
+        """,
+        (item_key(kind, week, client_id), kind, week, client_id, PENDING, TRANSIENT, reason, now, now, now),
+    )
+
+
+def resolve(conn: sqlite3.Connection, kind: str, week: str, client_id: str) -> bool:
+    cursor = conn.execute(
+        "DELETE FROM retry_items WHERE item_key = ?",
+        (item_key(kind, week, client_id),),
+    )
+    return cursor.rowcount > 0
+
+
+def due_items(conn: sqlite3.Connection, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    now = now or now_utc()
+    rows = conn.execute(
+        "SELECT * FROM retry_items WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at",
+        (PENDING, iso(now)),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def next_due_at(conn: sqlite3.Connection) -> Optional[datetime]:
+    row = conn.execute(
+        "SELECT MIN(next_attempt_at) AS due FROM retry_items WHERE status = ?",
+        (PENDING,),
+    ).fetchone()
+    return datetime.fromisoformat(row["due"]) if row and row["due"] else None
+
+
+def count_items(conn: sqlite3.Connection) -> Dict[str, int]:
+    rows = conn.execute("SELECT status, COUNT(*) AS n FROM retry_items GROUP BY status").fetchall()
+    return {row["status"]: row["n"] for row in rows}
+
+
+def record_outcomes(kind: str, week: str, outcomes: Iterable[Outcome]) -> Dict[str, int]:
+    """
+    Queue this stage's failed deliveries and clear the queued ones that
+    have now succeeded, in one transaction.
+    """
+    counts = {"queued": 0, "dead": 0, "resolved": 0}
+
+    with transaction() as conn:
+        for client_id, ok, status_code, error in outcomes:
+            if ok:
+                counts["resolved"] += int(resolve(conn, kind, week, client_id))
+                continue
+
+            item = record_failure(conn, kind, week, client_id, error, status_code)
+            counts["dead" if item["status"] == DEAD else "queued"] += 1
+
+    if counts["queued"] or counts["dead"]:
+        print(f"Retry queue ({kind}): {counts['queued']} queued, {counts['dead']} not retryable")
+
+    return counts
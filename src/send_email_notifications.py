@@ -6,6 +6,8 @@ from email.message import EmailMessage
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from src import manifest_store, retry_queue
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
@@ -41,10 +43,6 @@ def load_json(path: Path) -> Optional[Dict[str, Any]]:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def save_json(path: Path, data: Dict[str, Any]) -> None:
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-
-
 def split_emails(value: str) -> List[str]:
     if not value:
         return []
@@ -233,11 +231,8 @@ def process_client(client: Dict[str, Any], week: str, email_mode: str) -> bool:
 
 def main() -> None:
     week_dir = find_latest_week_dir()
-    manifest_path = week_dir / "distribution_manifest.json"
-    manifest = load_json(manifest_path)
-
-    if not manifest:
-        raise RuntimeError(f"Missing distribution manifest: {manifest_path}")
+    manifest_path = manifest_store.manifest_json_path(week_dir)
+    manifest = manifest_store.load_manifest(week_dir)
 
     week = manifest.get("week", week_dir.name)
     clients = manifest.get("clients", [])
@@ -253,11 +248,9 @@ def main() -> None:
     changed_count = 0
 
     for client in clients:
-        before = json.dumps(client, sort_keys=True)
         sent = process_client(client, week, email_mode)
-        after = json.dumps(client, sort_keys=True)
 
-        if before != after:
+        if manifest_store.client_changed(client):
             changed_count += 1
 
         status = client.get("email_status")
@@ -269,15 +262,25 @@ def main() -> None:
         else:
             skipped_count += 1
 
+    if email_mode == "real":
+        retry_queue.record_outcomes(
+            "email",
+            week,
+            [
+                (client["client_id"], client.get("email_status") == "sent", None, client.get("email_error"))
+                for client in clients
+                if client.get("email_status") in ("sent", "failed")
+            ],
+        )
+
     manifest["email_notifications_completed_at"] = now_iso()
     manifest["email_mode"] = email_mode
     manifest["email_sent_client_count"] = sent_count
     manifest["email_failed_client_count"] = failed_count
     manifest["email_skipped_client_count"] = skipped_count
     manifest["email_changed_client_count"] = changed_count
-    manifest["last_updated_at"] = now_iso()
 
-    save_json(manifest_path, manifest)
+    manifest_store.save_manifest(week_dir, manifest, stage="email_notifications")
 
     print(f"Saved manifest: {manifest_path}")
     print(f"Email mode: {email_mode}")
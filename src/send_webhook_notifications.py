@@ -1,11 +1,15 @@
+import hashlib
 import json
 import os
-import urllib.error
-import urllib.request
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from src import manifest_store, retry_queue, webhook_http
+from src.concurrency import worker_count
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
@@ -28,18 +32,11 @@ def find_week_dir() -> Path:
 
 
 def load_manifest(week_dir: Path) -> Dict[str, Any]:
-    manifest_path = week_dir / "distribution_manifest.json"
-    if not manifest_path.exists():
-        raise RuntimeError(f"Missing distribution manifest: {manifest_path}")
-
-    with manifest_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return manifest_store.load_manifest(week_dir)
 
 
 def save_manifest(week_dir: Path, manifest: Dict[str, Any]) -> None:
-    manifest_path = week_dir / "distribution_manifest.json"
-    manifest["last_updated_at"] = datetime.now(timezone.utc).isoformat()
-    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    manifest_path = manifest_store.save_manifest(week_dir, manifest, stage="webhook_notifications")
     print(f"Saved manifest: {manifest_path}")
 
 
@@ -60,43 +57,18 @@ def build_payload(client: Dict[str, Any], week: str) -> Dict[str, Any]:
     }
 
 
+def payload_sha256(payload: Dict[str, Any]) -> str:
+    # The manifest keeps a digest of what was sent, not a second copy of it.
+    data = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
 def post_json(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    data = json.dumps(payload).encode("utf-8")
-
-    request = urllib.request.Request(
-        url=url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "User-Agent": "whoa-trucking-pack-webhook/1.0",
-        },
-        method="POST",
-    )
-
-    try:
-        with urllib.request.urlopen(request, timeout=20) as response:
-            body = response.read().decode("utf-8", errors="replace")
-            return {
-                "ok": 200 <= response.status < 300,
-                "status_code": response.status,
-                "response_body": body[:1000],
-            }
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")
-        return {
-            "ok": False,
-            "status_code": e.code,
-            "response_body": body[:1000],
-        }
-    except Exception as e:
-        return {
-            "ok": False,
-            "status_code": None,
-            "response_body": str(e),
-        }
+    # Pooled keep-alive session with per-request connect/read timeouts.
+    return webhook_http.post_json(url, payload)
 
 
-def process_client(client: Dict[str, Any], week: str, webhook_url: Optional[str]) -> bool:
+def is_notifiable(client: Dict[str, Any]) -> bool:
     client_id = client.get("client_id")
 
     if not client_id:
@@ -107,27 +79,29 @@ def process_client(client: Dict[str, Any], week: str, webhook_url: Optional[str]
         print(f"Skipping {client_id}: status={client.get('delivery_status')}")
         return False
 
-    payload = build_payload(client, week)
+    return True
 
-    if not webhook_url:
-        client["webhook_sent"] = True
-        client["webhook_mode"] = "mock"
-        client["webhook_sent_at"] = datetime.now(timezone.utc).isoformat()
-        client["webhook_payload_preview"] = payload
 
-        if client.get("delivery_status") == "published":
-            client["delivery_status"] = "notified"
+def record_mock(client: Dict[str, Any], payload: Dict[str, Any]) -> None:
+    client["webhook_sent"] = True
+    client["webhook_mode"] = "mock"
+    client["webhook_sent_at"] = datetime.now(timezone.utc).isoformat()
+    client["webhook_payload_sha256"] = payload_sha256(payload)
 
-        print(f"Mock webhook recorded for: {client_id}")
-        return True
+    if client.get("delivery_status") == "published":
+        client["delivery_status"] = "notified"
 
-    result = post_json(webhook_url, payload)
+    print(f"Mock webhook recorded for: {client['client_id']}")
+
+
+def record_result(client: Dict[str, Any], payload: Dict[str, Any], result: Dict[str, Any]) -> None:
+    client_id = client["client_id"]
 
     client["webhook_mode"] = "real"
     client["webhook_sent_at"] = datetime.now(timezone.utc).isoformat()
     client["webhook_status_code"] = result.get("status_code")
     client["webhook_response_preview"] = result.get("response_body")
-    client["webhook_payload_preview"] = payload
+    client["webhook_payload_sha256"] = payload_sha256(payload)
 
     if result.get("ok"):
         client["webhook_sent"] = True
@@ -137,15 +111,161 @@ def process_client(client: Dict[str, Any], week: str, webhook_url: Optional[str]
             client["delivery_status"] = "notified"
 
         print(f"Webhook sent for: {client_id}")
-        return True
+        return
 
     client["webhook_sent"] = False
     client["delivery_status"] = "notify_failed"
     client["error"] = f"Webhook failed: {result.get('status_code')} {result.get('response_body')}"
     print(f"Webhook failed for: {client_id}")
+
+
+def process_client(client: Dict[str, Any], week: str, webhook_url: Optional[str]) -> bool:
+    if not is_notifiable(client):
+        return False
+
+    payload = build_payload(client, week)
+
+    if not webhook_url:
+        record_mock(client, payload)
+        return True
+
+    client["webhook_batch_id"] = None
+    record_result(client, payload, post_json(webhook_url, payload))
     return True
 
 
+def build_batch_payload(
+    records: List[Dict[str, Any]],
+    week: str,
+    batch_id: str,
+) -> Dict[str, Any]:
+    return {
+        "week": week,
+        "batch_id": batch_id,
+        "client_count": len(records),
+        "clients": records,
+        "sent_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def read_batch_results(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-client results from a batch reply, keyed by client_id. Receivers
+    may answer {"results": [{"client_id": ..., "ok": ...}, ...]} or the
+    bare list; any other reply applies to the whole batch.
+    """
+    data = result.get("response_json")
+
+    if isinstance(data, dict):
+        data = data.get("results")
+
+    if not isinstance(data, list):
+        return {}
+
+    return {
+        item["client_id"]: item
+        for item in data
+        if isinstance(item, dict) and item.get("client_id")
+    }
+
+
+def client_result(batch_result: Dict[str, Any], item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Without its own entry, a client shares the outcome of its batch.
+    if item is None or not batch_result.get("ok"):
+        return batch_result
+
+    ok = item.get("ok", True) is not False and not item.get("error")
+
+    # A client rejected inside a 2xx batch has no HTTP status of its own
+    # unless the receiver gives one; the batch's 200 would mark it as a
+    # permanent failure in the retry queue.
+    status_code = item.get("status_code")
+    if not isinstance(status_code, int):
+        status_code = None
+
+    return {
+        "ok": ok,
+        "status_code": batch_result.get("status_code") if ok else status_code,
+        "response_body": json.dumps(item)[:webhook_http.RESPONSE_PREVIEW_CHARS],
+    }
+
+
+def process_batch(
+    clients: List[Dict[str, Any]],
+    week: str,
+    webhook_url: str,
+    batch_id: str,
+) -> None:
+    payloads = [build_payload(client, week) for client in clients]
+    batch_result = post_json(webhook_url, build_batch_payload(payloads, week, batch_id))
+    results = read_batch_results(batch_result)
+
+    print(f"Webhook batch {batch_id}: {len(clients)} clients, status={batch_result.get('status_code')}")
+
+    for client, payload in zip(clients, payloads):
+        client["webhook_batch_id"] = batch_id
+        record_result(client, payload, client_result(batch_result, results.get(client["client_id"])))
+
+
+def notify_batches(
+    clients: List[Dict[str, Any]],
+    week: str,
+    webhook_url: str,
+    batch_size: int,
+    workers: Optional[int] = None,
+) -> List[bool]:
+    eligible = [is_notifiable(client) for client in clients]
+    pending = [client for client, ok in zip(clients, eligible) if ok]
+
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    batch_ids = [f"{week}-{index + 1:03d}-of-{len(batches):03d}" for index in range(len(batches))]
+
+    if workers is None:
+        workers = worker_count("WEBHOOK_WORKERS", webhook_http.DEFAULT_WORKERS, len(batches))
+
+    print(f"Webhook batch mode: {len(pending)} clients in {len(batches)} requests")
+
+    def run_batch(index: int) -> None:
+        process_batch(batches[index], week, webhook_url, batch_ids[index])
+
+    if workers <= 1:
+        for index in range(len(batches)):
+            run_batch(index)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(run_batch, range(len(batches))))
+
+    return eligible
+
+
+def notify_clients(
+    clients: List[Dict[str, Any]],
+    week: str,
+    webhook_url: Optional[str],
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> List[bool]:
+    if batch_size is None:
+        batch_size = webhook_http.get_batch_size()
+
+    if webhook_url and batch_size > 0:
+        return notify_batches(clients, week, webhook_url, batch_size, workers)
+
+    def run_client(client: Dict[str, Any]) -> bool:
+        return process_client(client, week, webhook_url)
+
+    if workers is None:
+        workers = worker_count("WEBHOOK_WORKERS", webhook_http.DEFAULT_WORKERS, len(clients)) if webhook_url else 1
+
+    if workers == 1:
+        return [run_client(client) for client in clients]
+
+    # A slow receiver now holds up one worker instead of the whole stage.
+    print(f"Webhook workers: {workers}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_client, clients))
+
+
 def main() -> None:
     week_dir = find_week_dir()
     week = week_dir.name
@@ -163,12 +283,12 @@ def main() -> None:
     sent_count = 0
     failed_count = 0
 
-    for client in clients:
-        before = json.dumps(client, sort_keys=True)
-        changed = process_client(client, week, webhook_url)
-        after = json.dumps(client, sort_keys=True)
+    started = time.perf_counter()
+    results = notify_clients(clients, week, webhook_url)
+    seconds = time.perf_counter() - started
 
-        if changed and before != after:
+    for client, changed in zip(clients, results):
+        if changed and manifest_store.client_changed(client):
             changed_count += 1
 
         if client.get("webhook_sent"):
@@ -177,11 +297,24 @@ def main() -> None:
         if client.get("delivery_status") == "notify_failed":
             failed_count += 1
 
+    if webhook_url:
+        retry_queue.record_outcomes(
+            "webhook",
+            week,
+            [
+                (client["client_id"], client.get("delivery_status") != "notify_failed", client.get("webhook_status_code"), client.get("error"))
+                for client, changed in zip(clients, results)
+                if changed
+            ],
+        )
+
     manifest["webhook_notifications_completed_at"] = datetime.now(timezone.utc).isoformat()
     manifest["webhook_changed_client_count"] = changed_count
     manifest["webhook_sent_client_count"] = sent_count
     manifest["webhook_failed_client_count"] = failed_count
     manifest["webhook_mode"] = "real" if webhook_url else "mock"
+    manifest["webhook_notifications_seconds"] = round(seconds, 3)
+    manifest["webhook_batch_size"] = webhook_http.get_batch_size() if webhook_url else 0
 
     save_manifest(week_dir, manifest)
 
@@ -1,9 +1,10 @@
-import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List
 
+from src import manifest_store
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
@@ -27,25 +28,11 @@ def find_week_dir() -> Path:
 
 
 def load_manifest(week_dir: Path) -> Dict[str, Any]:
-    manifest_path = week_dir / "distribution_manifest.json"
-
-    if not manifest_path.exists():
-        raise RuntimeError(f"Missing distribution manifest: {manifest_path}")
-
-    with manifest_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return manifest_store.load_manifest(week_dir)
 
 
 def save_manifest(week_dir: Path, manifest: Dict[str, Any]) -> None:
-    manifest_path = week_dir / "distribution_manifest.json"
-
-    manifest["last_updated_at"] = datetime.now(timezone.utc).isoformat()
-
-    manifest_path.write_text(
-        json.dumps(manifest, indent=2),
-        encoding="utf-8",
-    )
-
+    manifest_path = manifest_store.save_manifest(week_dir, manifest, stage="simulated_failure_retry")
     print(f"Saved manifest: {manifest_path}")
 
 
@@ -104,11 +91,9 @@ def main() -> None:
     retry_pending_count = 0
 
     for client in clients:
-        before = json.dumps(client, sort_keys=True)
         changed = process_client(client)
-        after = json.dumps(client, sort_keys=True)
 
-        if changed and before != after:
+        if changed and manifest_store.client_changed(client):
             changed_count += 1
 
         if client.get("delivery_status") == "confirmed":
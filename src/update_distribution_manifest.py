@@ -1,9 +1,12 @@
 import argparse
+import csv
 import json
 import os
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+from src import manifest_store
+from src.delivery_record import MISSING, InvalidStatusTransition, parse_field_value
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -27,76 +30,190 @@ def find_week_dir() -> Path:
     return sorted(week_dirs, key=lambda p: p.name)[-1]
 
 
-def load_manifest(week_dir: Path) -> Dict[str, Any]:
-    manifest_path = week_dir / "distribution_manifest.json"
+def parse_assignment(text: str) -> Tuple[str, Any]:
+    if "=" not in text:
+        raise ValueError(f"Expected FIELD=VALUE, got: {text}")
 
-    if not manifest_path.exists():
-        raise RuntimeError(f"Missing distribution manifest: {manifest_path}")
+    field, raw_value = text.split("=", 1)
+    field = field.strip()
+    return field, parse_field_value(field, raw_value)
 
-    with manifest_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
 
+def read_update_file(path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Read (client_id, field, value) rows from a CSV file with a header row or
+    from JSONL. CSV values are parsed with the field's schema type; JSONL
+    values are used as typed, so a JSONL null clears a field.
+    """
+    if not path.is_file():
+        raise ValueError(f"Update file does not exist: {path}")
 
-def save_manifest(week_dir: Path, manifest: Dict[str, Any]) -> None:
-    manifest_path = week_dir / "distribution_manifest.json"
+    rows: List[Dict[str, Any]] = []
 
-    manifest["last_updated_at"] = datetime.now(timezone.utc).isoformat()
+    if path.suffix.lower() == ".jsonl":
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                rows.append(json.loads(line))
+    else:
+        with path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            missing = [name for name in ("client_id", "field", "value") if name not in (reader.fieldnames or [])]
 
-    manifest_path.write_text(
-        json.dumps(manifest, indent=2),
-        encoding="utf-8",
-    )
+            if missing:
+                raise ValueError(f"Update CSV {path} has no {', '.join(missing)} column; expected a client_id,field,value header")
 
-    print(f"Updated manifest: {manifest_path}")
+            for row in reader:
+                row["value"] = parse_field_value(row["field"], row.get("value") or "")
+                rows.append(row)
 
+    updates: Dict[str, Dict[str, Any]] = {}
 
-def update_client_record(
-    manifest: Dict[str, Any],
-    client_id: str,
-    field: str,
-    value: Any,
-) -> bool:
-    clients = manifest.get("clients", [])
+    for row in rows:
+        client_id = str(row.get("client_id") or "").strip()
+        field = str(row.get("field") or "").strip()
 
-    for client in clients:
-        if client.get("client_id") == client_id:
-            client[field] = value
-            return True
+        if not client_id or not field:
+            raise ValueError(f"Update row missing client_id or field: {row}")
 
-    return False
+        updates.setdefault(client_id, {})[field] = row.get("value")
 
+    return updates
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
 
-    parser.add_argument("--client-id", required=True)
-    parser.add_argument("--field", required=True)
-    parser.add_argument("--value", required=True)
+def print_changes(changes: List[Tuple[str, str, Any, Any]]) -> None:
+    for client_id, field, old, new in changes:
+        old_text = "<unset>" if old is MISSING else json.dumps(old, default=str)
+        new_text = "<unset>" if new is MISSING else json.dumps(new, default=str)
+        print(f"- {client_id}.{field}: {old_text} -> {new_text}")
 
-    args = parser.parse_args()
 
+def apply_updates(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
     week_dir = find_week_dir()
 
-    manifest = load_manifest(week_dir)
-
-    updated = update_client_record(
-        manifest,
-        args.client_id,
-        args.field,
-        args.value,
+    if args.file or args.where:
+        if args.file and args.where:
+            parser.error("--file and --where cannot be combined")
+
+        if args.where and not (args.set_fields or args.unset_fields):
+            parser.error("--where requires at least one --set or --unset")
+
+        if args.file:
+            changes = manifest_store.update_clients(
+                week_dir,
+                read_update_file(args.file),
+                stage="manual_bulk_update",
+                dry_run=args.dry_run,
+            )
+        else:
+            fields = dict(parse_assignment(item) for item in args.set_fields)
+            fields.update((field, None) for field in args.unset_fields)
+
+            changes = manifest_store.update_matching_clients(
+                week_dir,
+                dict(parse_assignment(item) for item in args.where),
+                fields,
+                stage="manual_bulk_update",
+                dry_run=args.dry_run,
+            )
+
+        print_changes(changes)
+
+        if args.dry_run:
+            print(f"Dry run: {len(changes)} field changes not written")
+            return
+
+        print(f"Updated manifest: {manifest_store.manifest_json_path(week_dir)}")
+        print(f"Applied {len(changes)} field changes")
+        return
+
+    if not args.client_id or not (args.unset_fields or (args.field and args.value is not None)):
+        parser.error("--client-id with --field and --value, or with --unset, is required without --file or --where")
+
+    fields: Dict[str, Any] = {}
+
+    if args.field and args.value is not None:
+        fields[args.field] = parse_field_value(args.field, args.value)
+
+    fields.update((field, None) for field in args.unset_fields)
+
+    if args.dry_run:
+        changes = manifest_store.update_clients(
+            week_dir,
+            {args.client_id: fields},
+            dry_run=True,
+        )
+        print_changes(changes)
+        print(f"Dry run: {len(changes)} field changes not written")
+        return
+
+    manifest_store.update_clients(
+        week_dir,
+        {args.client_id: fields},
+        stage="manual_update",
     )
 
-    if not updated:
-        raise RuntimeError(
-            f"Client not found in distribution manifest: {args.client_id}"
+    print(f"Updated manifest: {manifest_store.manifest_json_path(week_dir)}")
+
+    if args.field and args.value is not None:
+        print(
+            f"Updated client '{args.client_id}' field '{args.field}' -> '{args.value}'"
         )
 
-    save_manifest(week_dir, manifest)
+    for field in args.unset_fields:
+        print(f"Cleared client '{args.client_id}' field '{field}'")
+
 
-    print(
-        f"Updated client '{args.client_id}' field '{args.field}' -> '{args.value}'"
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Patch client records in the week's distribution manifest.",
     )
 
+    parser.add_argument("--client-id")
+    parser.add_argument("--field")
+    parser.add_argument("--value")
+
+    parser.add_argument(
+        "--file",
+        type=Path,
+        help="CSV (client_id,field,value header) or JSONL of updates applied in one transaction",
+    )
+    parser.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="Select clients by field value; repeat to AND conditions",
+    )
+    parser.add_argument(
+        "--set",
+        dest="set_fields",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="Field to set on every client matched by --where",
+    )
+    parser.add_argument(
+        "--unset",
+        dest="unset_fields",
+        action="append",
+        default=[],
+        metavar="FIELD",
+        help="Field to clear (set to null) on --client-id or every client matched by --where",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the changes without writing them",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        apply_updates(args, parser)
+    except (manifest_store.ClientNotFound, InvalidStatusTransition, ValueError, TypeError) as e:
+        print(f"Manifest update failed: {e}")
+        raise SystemExit(1)
+
 
 if __name__ == "__main__":
     main()
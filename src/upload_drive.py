@@ -4,21 +4,16 @@ import json
 from pathlib import Path
 from typing import Optional
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 
-SCOPES = ["https://www.googleapis.com/auth/drive"]
+from src import google_clients
+
+SCOPES = google_clients.DRIVE_FULL_SCOPES
 PARENT_FOLDER_ID = os.environ.get("GOOGLE_DRIVE_FOLDER_ID", "").strip()
-SA_JSON = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON", "").strip()
 
 
 def drive_service():
-    if not SA_JSON:
-        raise RuntimeError("GOOGLE_SERVICE_ACCOUNT_JSON is not set")
-    info = json.loads(SA_JSON)
-    creds = service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
-    return build("drive", "v3", credentials=creds, cache_discovery=False)
+    return google_clients.get_drive_service(SCOPES)
 
 
 def find_or_create_folder(svc, name: str, parent_id: str) -> str:
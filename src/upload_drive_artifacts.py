@@ -1,18 +1,50 @@
+import hashlib
 import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 
+from src import google_clients, manifest_store
+from src.concurrency import worker_count
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
 
-DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+DRIVE_SCOPES = google_clients.DRIVE_FILE_SCOPES
+
+FOLDER_CACHE_NAME = "drive_folder_cache.json"
+
+# Drive accepts at most 100 calls in one batch request.
+DRIVE_BATCH_LIMIT = 100
+
+DRIVE_FILE_FIELDS = "id, name, md5Checksum, webViewLink, webContentLink"
+
+# Resumable upload chunks must be a multiple of 256 KiB.
+CHUNK_UNIT_BYTES = 256 * 1024
+DEFAULT_CHUNK_MB = 8
+DEFAULT_CHUNK_RETRIES = 5
+DEFAULT_UPLOAD_WORKERS = 4
+
+# One lock per folder cache key, so two workers never create the same
+# folder while lookups for different folders still run in parallel.
+FOLDER_LOCKS: Dict[str, threading.Lock] = {}
+
+# Guards FOLDER_LOCKS, CHECKED_FOLDER_IDS and changes to the shared folder
+# cache dict.
+FOLDER_CACHE_LOCK = threading.Lock()
+
+# Folder IDs known to be live in Drive during this run: found or created
+# here, or read from the cache and checked once against Drive.
+CHECKED_FOLDER_IDS: Set[str] = set()
 
 
 def find_week_dir() -> Path:
@@ -32,18 +64,11 @@ def find_week_dir() -> Path:
 
 
 def load_manifest(week_dir: Path) -> Dict[str, Any]:
-    manifest_path = week_dir / "distribution_manifest.json"
-    if not manifest_path.exists():
-        raise RuntimeError(f"Missing distribution manifest: {manifest_path}")
-
-    with manifest_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return manifest_store.load_manifest(week_dir)
 
 
 def save_manifest(week_dir: Path, manifest: Dict[str, Any]) -> None:
-    manifest_path = week_dir / "distribution_manifest.json"
-    manifest["last_updated_at"] = datetime.now(timezone.utc).isoformat()
-    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    manifest_path = manifest_store.save_manifest(week_dir, manifest, stage="drive_upload")
     print(f"Saved manifest: {manifest_path}")
 
 
@@ -70,26 +95,140 @@ def has_drive_secrets() -> bool:
     )
 
 
-def get_drive_service():
-    raw_json = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON", "").strip()
+def get_env_int(name: str, default: int, minimum: int = 1) -> int:
+    value = os.getenv(name, "").strip()
 
-    if not raw_json:
-        raise RuntimeError("Missing GOOGLE_SERVICE_ACCOUNT_JSON")
+    if not value:
+        return default
 
-    service_account_info = json.loads(raw_json)
+    try:
+        return max(minimum, int(value))
+    except ValueError:
+        return default
+
+
+def get_chunk_size() -> int:
+    chunk_mb = get_env_int("DRIVE_UPLOAD_CHUNK_MB", DEFAULT_CHUNK_MB)
+    return chunk_mb * 4 * CHUNK_UNIT_BYTES
+
+
+def get_retry_count() -> int:
+    return get_env_int("DRIVE_UPLOAD_RETRIES", DEFAULT_CHUNK_RETRIES, minimum=0)
 
-    credentials = service_account.Credentials.from_service_account_info(
-        service_account_info,
-        scopes=DRIVE_SCOPES,
-    )
 
-    return build("drive", "v3", credentials=credentials)
+def get_drive_service():
+    # Built per thread on shared credentials; see src/google_clients.py.
+    return google_clients.get_drive_service(DRIVE_SCOPES)
 
 
 def drive_escape_query(value: str) -> str:
     return value.replace("\\", "\\\\").replace("'", "\\'")
 
 
+def folder_cache_path(week_dir: Path) -> Path:
+    return week_dir / FOLDER_CACHE_NAME
+
+
+def folder_cache_key(parent_id: str, folder_name: str) -> str:
+    return f"{parent_id}/{folder_name}"
+
+
+def load_folder_cache(week_dir: Path) -> Dict[str, str]:
+    path = folder_cache_path(week_dir)
+
+    if not path.exists():
+        return {}
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        print(f"Ignoring unreadable Drive folder cache: {path}")
+        return {}
+
+    return {str(key): str(value) for key, value in data.get("folders", {}).items()}
+
+
+def save_folder_cache(week_dir: Path, folder_cache: Dict[str, str]) -> None:
+    path = folder_cache_path(week_dir)
+    data = {
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "folders": dict(sorted(folder_cache.items())),
+    }
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def folder_lock(key: str) -> threading.Lock:
+    with FOLDER_CACHE_LOCK:
+        return FOLDER_LOCKS.setdefault(key, threading.Lock())
+
+
+def evict_folder(folder_cache: Dict[str, str], folder_id: str) -> None:
+    """
+    Drop a folder ID that Drive no longer knows about, together with every
+    cached child of it, so the next lookup falls back to list-and-create.
+    """
+    stale_ids = {folder_id}
+
+    while True:
+        stale_keys = [
+            key for key, value in folder_cache.items()
+            if value in stale_ids or key.split("/", 1)[0] in stale_ids
+        ]
+        if not stale_keys:
+            return
+
+        for key in stale_keys:
+            stale_ids.add(folder_cache.pop(key))
+
+        CHECKED_FOLDER_IDS.difference_update(stale_ids)
+
+
+def is_not_found(error: Exception) -> bool:
+    return isinstance(error, HttpError) and error.resp.status == 404
+
+
+def folder_is_live(service, folder_id: str) -> bool:
+    """
+    Whether folder_id still exists outside the trash. Drive keeps serving a
+    trashed folder by ID and accepts uploads into it, so a 404 alone does
+    not catch a cached folder someone trashed.
+    """
+    try:
+        folder = service.files().get(
+            fileId=folder_id,
+            fields="trashed",
+            supportsAllDrives=True,
+        ).execute(num_retries=get_retry_count())
+    except HttpError as e:
+        if is_not_found(e):
+            return False
+        raise
+
+    return not folder.get("trashed", False)
+
+
+def checked_cached_folder(service, key: str, folder_cache: Dict[str, str]) -> Optional[str]:
+    """
+    The cached folder ID for key, checked against Drive on its first use in
+    this run. A trashed or deleted folder is evicted with its cached
+    children and None returned, so the caller looks it up again.
+    """
+    with FOLDER_CACHE_LOCK:
+        folder_id = folder_cache.get(key)
+        if folder_id is None or folder_id in CHECKED_FOLDER_IDS:
+            return folder_id
+
+    if folder_is_live(service, folder_id):
+        with FOLDER_CACHE_LOCK:
+            CHECKED_FOLDER_IDS.add(folder_id)
+        return folder_id
+
+    print(f"Cached Drive folder is trashed or deleted: {key}")
+    with FOLDER_CACHE_LOCK:
+        evict_folder(folder_cache, folder_id)
+    return None
+
+
 def find_child_folder(service, parent_id: str, folder_name: str) -> Optional[str]:
     safe_name = drive_escape_query(folder_name)
 
@@ -107,7 +246,7 @@ def find_child_folder(service, parent_id: str, folder_name: str) -> Optional[str
         pageSize=10,
         supportsAllDrives=True,
         includeItemsFromAllDrives=True,
-    ).execute()
+    ).execute(num_retries=get_retry_count())
 
     files = response.get("files", [])
 
@@ -128,101 +267,327 @@ def create_child_folder(service, parent_id: str, folder_name: str) -> str:
         body=metadata,
         fields="id",
         supportsAllDrives=True,
-    ).execute()
+    ).execute(num_retries=get_retry_count())
 
     return folder["id"]
 
 
-def get_or_create_child_folder(service, parent_id: str, folder_name: str) -> str:
+def get_or_create_child_folder(
+    service,
+    parent_id: str,
+    folder_name: str,
+    folder_cache: Optional[Dict[str, str]] = None,
+) -> str:
+    key = folder_cache_key(parent_id, folder_name)
+
+    # Cached IDs are checked against Drive once per run and trusted after
+    # that; a folder deleted later in the run is caught by upload_real.
+    if folder_cache is not None:
+        with FOLDER_CACHE_LOCK:
+            folder_id = folder_cache.get(key)
+            if folder_id in CHECKED_FOLDER_IDS:
+                return folder_id
+
+    with folder_lock(key):
+        if folder_cache is not None:
+            folder_id = checked_cached_folder(service, key, folder_cache)
+            if folder_id:
+                return folder_id
+
+        return find_or_create_child_folder(service, parent_id, folder_name, folder_cache)
+
+
+def find_or_create_child_folder(
+    service,
+    parent_id: str,
+    folder_name: str,
+    folder_cache: Optional[Dict[str, str]] = None,
+) -> str:
     existing_id = find_child_folder(service, parent_id, folder_name)
 
     if existing_id:
         print(f"Found Drive folder: {folder_name}")
-        return existing_id
+        folder_id = existing_id
+    else:
+        folder_id = create_child_folder(service, parent_id, folder_name)
+        print(f"Created Drive folder: {folder_name}")
 
-    folder_id = create_child_folder(service, parent_id, folder_name)
-    print(f"Created Drive folder: {folder_name}")
-    return folder_id
+    if folder_cache is not None:
+        with FOLDER_CACHE_LOCK:
+            folder_cache[folder_cache_key(parent_id, folder_name)] = folder_id
+            CHECKED_FOLDER_IDS.add(folder_id)
 
+    return folder_id
 
-def delete_existing_file(service, parent_id: str, file_name: str) -> None:
-    safe_name = drive_escape_query(file_name)
 
+def list_folder_files(service, parent_id: str) -> Dict[str, List[Dict[str, str]]]:
+    """
+    List every file directly inside parent_id in one paged query, grouped
+    by name, so a client's artifacts can be matched without a query each.
+    """
     query = (
-        f"name = '{safe_name}' "
-        f"and '{parent_id}' in parents "
+        f"'{parent_id}' in parents "
+        f"and mimeType != 'application/vnd.google-apps.folder' "
         f"and trashed = false"
     )
 
-    response = service.files().list(
-        q=query,
-        spaces="drive",
-        fields="files(id, name)",
-        pageSize=20,
-        supportsAllDrives=True,
-        includeItemsFromAllDrives=True,
-    ).execute()
+    files_by_name: Dict[str, List[Dict[str, str]]] = {}
+    page_token = None
 
-    for file in response.get("files", []):
-        service.files().delete(
-            fileId=file["id"],
+    while True:
+        response = service.files().list(
+            q=query,
+            spaces="drive",
+            fields=f"nextPageToken, files({DRIVE_FILE_FIELDS})",
+            pageSize=100,
+            pageToken=page_token,
             supportsAllDrives=True,
-        ).execute()
-        print(f"Deleted existing Drive file: {file_name}")
+            includeItemsFromAllDrives=True,
+        ).execute(num_retries=get_retry_count())
 
+        for file in response.get("files", []):
+            files_by_name.setdefault(file["name"], []).append(file)
 
-def upload_file(service, parent_id: str, local_path: Path, mime_type: str) -> Dict[str, str]:
-    if not local_path.exists() or not local_path.is_file():
-        raise RuntimeError(f"Missing local file for Drive upload: {local_path}")
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return files_by_name
 
-    delete_existing_file(service, parent_id, local_path.name)
 
-    metadata = {
-        "name": local_path.name,
-        "parents": [parent_id],
+def execute_batch(service, requests: List[Tuple[str, Any]]) -> Dict[str, Exception]:
+    """
+    Send requests as Drive batch calls of at most DRIVE_BATCH_LIMIT each.
+    Returns the errors keyed by request ID; successful calls are omitted.
+    """
+    errors: Dict[str, Exception] = {}
+
+    def callback(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        if exception is not None:
+            errors[request_id] = exception
+
+    for start in range(0, len(requests), DRIVE_BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+
+        for request_id, request in requests[start:start + DRIVE_BATCH_LIMIT]:
+            batch.add(request, request_id=request_id)
+
+        call_with_retries(batch.execute, get_retry_count())
+
+    return errors
+
+
+def delete_files(service, files: List[Dict[str, str]]) -> None:
+    if not files:
+        return
+
+    requests = [
+        (file["id"], service.files().delete(fileId=file["id"], supportsAllDrives=True))
+        for file in files
+    ]
+
+    errors = execute_batch(service, requests)
+
+    for file in files:
+        error = errors.get(file["id"])
+
+        # Already gone is as good as deleted.
+        if error is not None and not is_not_found(error):
+            raise error
+
+        print(f"Deleted duplicate Drive file: {file['name']}")
+
+
+def share_files(service, uploaded: List[Dict[str, str]]) -> None:
+    if not uploaded:
+        return
+
+    requests = [
+        (
+            file["id"],
+            service.permissions().create(
+                fileId=file["id"],
+                body={
+                    "role": "reader",
+                    "type": "anyone",
+                },
+                supportsAllDrives=True,
+            ),
+        )
+        for file in uploaded
+    ]
+
+    errors = execute_batch(service, requests)
+
+    for file in uploaded:
+        error = errors.get(file["id"])
+        if error is not None:
+            print(f"Warning: could not make file public: {file['name']}: {error}")
+
+
+def md5_file(path: Path) -> str:
+    digest = hashlib.md5()
+
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def remote_md5(file: Dict[str, str], client: Dict[str, Any], kind: str) -> Optional[str]:
+    """
+    The md5 Drive reports for file, or the one cached in the manifest by the
+    last upload of that same file ID.
+    """
+    if file.get("md5Checksum"):
+        return file["md5Checksum"]
+
+    if file["id"] == client.get(f"drive_{kind}_file_id"):
+        return client.get(f"drive_{kind}_md5")
+
+    return None
+
+
+def file_result(file: Dict[str, str], local_path: Path, created: bool) -> Dict[str, Any]:
+    return {
+        "id": file["id"],
+        "name": file.get("name", local_path.name),
+        "md5Checksum": file.get("md5Checksum", ""),
+        "webViewLink": file.get("webViewLink", ""),
+        "webContentLink": file.get("webContentLink", ""),
+        "created": created,
     }
 
+
+def pick_existing_file(matches: List[Dict[str, str]], cached_id: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Choose which same-named Drive file to keep: the one recorded in the
+    manifest if it is still there, otherwise the first match.
+    """
+    for file in matches:
+        if file["id"] == cached_id:
+            return file
+
+    return matches[0] if matches else None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or error.resp.status >= 500
+
+    return isinstance(error, OSError)
+
+
+def call_with_retries(call: Callable[[], Any], num_retries: int) -> Any:
+    failures = 0
+
+    while True:
+        try:
+            return call()
+        except Exception as e:
+            if failures >= num_retries or not is_retryable(e):
+                raise
+
+            failures += 1
+            time.sleep(random.random() * 2 ** failures)
+
+
+def send_resumable(request, num_retries: int) -> Dict[str, Any]:
+    """
+    Send a resumable upload chunk by chunk, retrying each chunk on 429, 5xx
+    and connection errors with exponential backoff.
+
+    Retries are done here rather than via next_chunk(num_retries=...): the
+    library would resend the same, already-consumed file slice. Calling
+    next_chunk again instead asks Drive how many bytes it has and resumes
+    from there with a fresh slice.
+    """
+    response = None
+
+    while response is None:
+        _, response = call_with_retries(request.next_chunk, num_retries)
+
+    return response
+
+
+def upload_file(
+    service,
+    parent_id: str,
+    local_path: Path,
+    mime_type: str,
+    existing_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Upload local_path into parent_id. An existing file is updated in place,
+    which keeps its ID, links and permissions; otherwise a new file is
+    created and returned with created=True so the caller can share it.
+    """
+    if not local_path.exists() or not local_path.is_file():
+        raise RuntimeError(f"Missing local file for Drive upload: {local_path}")
+
     media = MediaFileUpload(
         str(local_path),
         mimetype=mime_type,
-        resumable=False,
+        chunksize=get_chunk_size(),
+        resumable=True,
     )
 
-    uploaded = service.files().create(
-        body=metadata,
-        media_body=media,
-        fields="id, webViewLink, webContentLink",
-        supportsAllDrives=True,
-    ).execute()
-
-    file_id = uploaded["id"]
-
-    try:
-        service.permissions().create(
-            fileId=file_id,
-            body={
-                "role": "reader",
-                "type": "anyone",
-            },
+    if existing_id:
+        request = service.files().update(
+            fileId=existing_id,
+            media_body=media,
+            fields=DRIVE_FILE_FIELDS,
             supportsAllDrives=True,
-        ).execute()
-    except Exception as e:
-        print(f"Warning: could not make file public: {local_path.name}: {e}")
+        )
+    else:
+        metadata = {
+            "name": local_path.name,
+            "parents": [parent_id],
+        }
+
+        request = service.files().create(
+            body=metadata,
+            media_body=media,
+            fields=DRIVE_FILE_FIELDS,
+            supportsAllDrives=True,
+        )
 
-    file_info = service.files().get(
-        fileId=file_id,
-        fields="id, webViewLink, webContentLink",
-        supportsAllDrives=True,
-    ).execute()
+    uploaded = send_resumable(request, get_retry_count())
+    print(f"{'Updated' if existing_id else 'Created'} Drive file: {local_path.name}")
 
-    return {
-        "id": file_info["id"],
-        "webViewLink": file_info.get("webViewLink", ""),
-        "webContentLink": file_info.get("webContentLink", ""),
-    }
+    return file_result(uploaded, local_path, created=not existing_id)
 
 
-def upload_real(client: Dict[str, Any], week_dir: Path, service, root_drive_folder_id: str) -> None:
+def upload_real(
+    client: Dict[str, Any],
+    week_dir: Path,
+    service,
+    root_drive_folder_id: str,
+    folder_cache: Optional[Dict[str, str]] = None,
+) -> None:
+    try:
+        upload_client_files(client, week_dir, service, root_drive_folder_id, folder_cache)
+    except HttpError as e:
+        if not folder_cache or not is_not_found(e):
+            raise
+
+        # A cached folder was deleted from Drive after its first-use check:
+        # forget the cached IDs under the root and retry once with fresh
+        # lookups.
+        print(f"Drive folder cache is stale for {client['client_id']}: refreshing")
+        with FOLDER_CACHE_LOCK:
+            cached_week_id = folder_cache.get(folder_cache_key(root_drive_folder_id, week_dir.name))
+            if cached_week_id:
+                evict_folder(folder_cache, cached_week_id)
+        upload_client_files(client, week_dir, service, root_drive_folder_id, folder_cache)
+
+
+def upload_client_files(
+    client: Dict[str, Any],
+    week_dir: Path,
+    service,
+    root_drive_folder_id: str,
+    folder_cache: Optional[Dict[str, str]] = None,
+) -> None:
     week_key = week_dir.name
     client_id = client["client_id"]
 
@@ -230,46 +595,68 @@ def upload_real(client: Dict[str, Any], week_dir: Path, service, root_drive_fold
         service,
         root_drive_folder_id,
         week_key,
+        folder_cache,
     )
 
     client_folder_id = get_or_create_child_folder(
         service,
         week_folder_id,
         client_id,
+        folder_cache,
     )
 
-    package_path = week_dir / client["package_zip"]
-    pdf_path = week_dir / client["pdf"]
-    markdown_path = week_dir / client["markdown"]
-
-    zip_result = upload_file(
-        service,
-        client_folder_id,
-        package_path,
-        "application/zip",
-    )
-
-    pdf_result = upload_file(
-        service,
-        client_folder_id,
-        pdf_path,
-        "application/pdf",
-    )
+    artifacts = {
+        "zip": (week_dir / client["package_zip"], "application/zip"),
+        "pdf": (week_dir / client["pdf"], "application/pdf"),
+        "markdown": (week_dir / client["markdown"], "text/markdown"),
+    }
 
-    markdown_result = upload_file(
-        service,
-        client_folder_id,
-        markdown_path,
-        "text/markdown",
-    )
+    for local_path, _ in artifacts.values():
+        if not local_path.exists() or not local_path.is_file():
+            raise RuntimeError(f"Missing local file for Drive upload: {local_path}")
+
+    # One listing finds the file to update for every artifact; any other
+    # copies with the same name go in one batched delete.
+    existing = list_folder_files(service, client_folder_id)
+    kept: Dict[str, Optional[Dict[str, str]]] = {}
+    duplicates: List[Dict[str, str]] = []
+
+    for kind, (local_path, _) in artifacts.items():
+        matches = existing.get(local_path.name, [])
+        keep = pick_existing_file(matches, client.get(f"drive_{kind}_file_id"))
+        kept[kind] = keep
+        duplicates.extend(file for file in matches if file is not keep)
+
+    delete_files(service, duplicates)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    local_md5s: Dict[str, str] = {}
+
+    for kind, (local_path, mime_type) in artifacts.items():
+        keep = kept[kind]
+        local_md5s[kind] = md5_file(local_path)
+
+        # Same bytes already in Drive: reuse the file without transferring it.
+        if keep and remote_md5(keep, client, kind) == local_md5s[kind]:
+            print(f"Unchanged Drive file: {local_path.name}")
+            results[kind] = file_result(keep, local_path, created=False)
+            continue
+
+        results[kind] = upload_file(
+            service,
+            client_folder_id,
+            local_path,
+            mime_type,
+            existing_id=keep["id"] if keep else None,
+        )
 
-    client["drive_zip_url"] = zip_result["webViewLink"]
-    client["drive_pdf_url"] = pdf_result["webViewLink"]
-    client["drive_markdown_url"] = markdown_result["webViewLink"]
+    # Updated files keep their permissions; only new ones need sharing.
+    share_files(service, [result for result in results.values() if result["created"]])
 
-    client["drive_zip_file_id"] = zip_result["id"]
-    client["drive_pdf_file_id"] = pdf_result["id"]
-    client["drive_markdown_file_id"] = markdown_result["id"]
+    for kind, result in results.items():
+        client[f"drive_{kind}_url"] = result["webViewLink"]
+        client[f"drive_{kind}_file_id"] = result["id"]
+        client[f"drive_{kind}_md5"] = result["md5Checksum"] or local_md5s[kind]
 
     client["drive_week_folder_id"] = week_folder_id
     client["drive_client_folder_id"] = client_folder_id
@@ -286,6 +673,7 @@ def process_client(
     use_real_drive: bool,
     service=None,
     root_drive_folder_id: Optional[str] = None,
+    folder_cache: Optional[Dict[str, str]] = None,
 ) -> bool:
     client_id = client.get("client_id")
 
@@ -302,7 +690,7 @@ def process_client(
         if use_real_drive:
             if service is None or not root_drive_folder_id:
                 raise RuntimeError("Real Drive upload requested without service/folder ID")
-            upload_real(client, week_dir, service, root_drive_folder_id)
+            upload_real(client, week_dir, service, root_drive_folder_id, folder_cache)
         else:
             upload_mock(client)
 
@@ -318,19 +706,51 @@ def process_client(
         return True
 
 
+def upload_clients(
+    clients: List[Dict[str, Any]],
+    week_dir: Path,
+    use_real_drive: bool,
+    root_drive_folder_id: Optional[str] = None,
+    folder_cache: Optional[Dict[str, str]] = None,
+    workers: Optional[int] = None,
+) -> List[bool]:
+    def run_client(client: Dict[str, Any]) -> bool:
+        return process_client(
+            client,
+            week_dir,
+            use_real_drive,
+            service=get_drive_service() if use_real_drive else None,
+            root_drive_folder_id=root_drive_folder_id,
+            folder_cache=folder_cache,
+        )
+
+    if workers is None:
+        workers = worker_count("DRIVE_UPLOAD_WORKERS", DEFAULT_UPLOAD_WORKERS, len(clients)) if use_real_drive else 1
+
+    if workers == 1:
+        return [run_client(client) for client in clients]
+
+    # Uploads are network-bound, so threads overlap them well.
+    # executor.map keeps results in client order.
+    print(f"Drive upload workers: {workers}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_client, clients))
+
+
 def main() -> None:
     week_dir = find_week_dir()
     manifest = load_manifest(week_dir)
 
     use_real_drive = has_drive_secrets()
 
-    service = None
     root_drive_folder_id = None
+    folder_cache: Optional[Dict[str, str]] = None
 
     if use_real_drive:
         print("Drive credentials detected: real upload mode")
-        service = get_drive_service()
+        google_clients.get_credentials(DRIVE_SCOPES)
         root_drive_folder_id = os.getenv("GOOGLE_DRIVE_FOLDER_ID", "").strip()
+        folder_cache = load_folder_cache(week_dir)
     else:
         print("Drive credentials not found: mock upload mode")
 
@@ -340,20 +760,16 @@ def main() -> None:
     uploaded_count = 0
     failed_count = 0
 
-    for client in clients:
-        before = json.dumps(client, sort_keys=True)
-
-        changed = process_client(
-            client,
-            week_dir,
-            use_real_drive,
-            service=service,
-            root_drive_folder_id=root_drive_folder_id,
-        )
-
-        after = json.dumps(client, sort_keys=True)
+    results = upload_clients(
+        clients,
+        week_dir,
+        use_real_drive,
+        root_drive_folder_id=root_drive_folder_id,
+        folder_cache=folder_cache,
+    )
 
-        if changed and before != after:
+    for client, changed in zip(clients, results):
+        if changed and manifest_store.client_changed(client):
             changed_count += 1
 
         if client.get("delivery_status") == "uploaded":
@@ -370,6 +786,9 @@ def main() -> None:
 
     save_manifest(week_dir, manifest)
 
+    if folder_cache is not None:
+        save_folder_cache(week_dir, folder_cache)
+
     print(f"Drive uploaded clients: {uploaded_count}")
     print(f"Drive failed clients: {failed_count}")
     print(f"Changed client records: {changed_count}")
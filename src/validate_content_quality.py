@@ -1,8 +1,11 @@
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
+
+from src.concurrency import worker_count
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -66,6 +69,13 @@ SKIP_DIR_NAMES = {
 }
 
 
+COMPILED_PATTERNS: List[Tuple[str, str, re.Pattern]] = [
+    (category, pattern, re.compile(pattern, flags=re.IGNORECASE))
+    for category, patterns in BANNED_PATTERNS.items()
+    for pattern in patterns
+]
+
+
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -110,10 +120,9 @@ def discover_client_dirs(week_dir: Path) -> List[Path]:
 def scan_text(text: str) -> List[Tuple[str, str]]:
     findings: List[Tuple[str, str]] = []
 
-    for category, patterns in BANNED_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text, flags=re.IGNORECASE):
-                findings.append((category, pattern))
+    for category, pattern, compiled in COMPILED_PATTERNS:
+        if compiled.search(text):
+            findings.append((category, pattern))
 
     return findings
 
@@ -155,6 +164,40 @@ def validate_file(path: Path) -> Dict:
     return record
 
 
+def validate_client_dir(client_dir: Path) -> Tuple[Dict, int]:
+    client_record = {
+        "client_folder": client_dir.name,
+        "status": "passed",
+        "files": [],
+    }
+
+    error_count = 0
+
+    for filename in FILES_TO_SCAN:
+        file_record = validate_file(client_dir / filename)
+        client_record["files"].append(file_record)
+
+        if not file_record["passed"]:
+            client_record["status"] = "failed"
+            error_count += len(file_record["matches"])
+
+    return client_record, error_count
+
+
+def iter_client_results(client_dirs: List[Path]) -> Iterator[Tuple[Dict, int]]:
+    workers = worker_count("CONTENT_QUALITY_WORKERS", None, len(client_dirs))
+
+    if workers == 1:
+        for client_dir in client_dirs:
+            yield validate_client_dir(client_dir)
+        return
+
+    # executor.map yields results in submission order, so the report keeps
+    # the same sorted client order as the serial path.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(validate_client_dir, client_dirs)
+
+
 def write_report(week_dir: Path, report: Dict) -> Path:
     report_path = week_dir / "content_quality_report.json"
     report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
@@ -178,22 +221,9 @@ def main() -> None:
 
     error_count = 0
 
-    for client_dir in client_dirs:
-        client_record = {
-            "client_folder": client_dir.name,
-            "status": "passed",
-            "files": [],
-        }
-
-        for filename in FILES_TO_SCAN:
-            file_record = validate_file(client_dir / filename)
-            client_record["files"].append(file_record)
-
-            if not file_record["passed"]:
-                client_record["status"] = "failed"
-                error_count += len(file_record["matches"])
-
+    for client_record, client_error_count in iter_client_results(client_dirs):
         report["clients"].append(client_record)
+        error_count += client_error_count
 
     report["error_count"] = error_count
 
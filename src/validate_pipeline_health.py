@@ -1,8 +1,9 @@
-import json
 import os
 from pathlib import Path
 from typing import Any, Dict, List
 
+from src.manifest_store import load_manifest
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = ROOT_DIR / "output"
@@ -24,14 +25,6 @@ def find_week_dir() -> Path:
     return sorted(week_dirs, key=lambda p: p.name)[-1]
 
 
-def load_manifest(week_dir: Path) -> Dict[str, Any]:
-    path = week_dir / "distribution_manifest.json"
-    if not path.exists():
-        raise RuntimeError(f"Missing distribution manifest: {path}")
-
-    return json.loads(path.read_text(encoding="utf-8"))
-
-
 def main() -> None:
     week_dir = find_week_dir()
     manifest = load_manifest(week_dir)
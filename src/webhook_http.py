@@ -0,0 +1,132 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.concurrency import worker_limit
+
+
+USER_AGENT = "whoa-trucking-pack-webhook/1.0"
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 20.0
+DEFAULT_WORKERS = 8
+
+# 0 sends one request per client; K > 0 sends the records in chunks of K.
+DEFAULT_BATCH_SIZE = 0
+
+RESPONSE_PREVIEW_CHARS = 1000
+
+# One keep-alive session for the whole process, shared by every worker.
+SESSION: Optional[requests.Session] = None
+SESSION_LOCK = threading.Lock()
+
+
+def get_env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "").strip()
+
+    if not value:
+        return default
+
+    try:
+        return max(0.1, float(value))
+    except ValueError:
+        return default
+
+
+def get_batch_size() -> int:
+    value = os.getenv("WEBHOOK_BATCH_SIZE", "").strip()
+
+    try:
+        return max(0, int(value)) if value else DEFAULT_BATCH_SIZE
+    except ValueError:
+        return DEFAULT_BATCH_SIZE
+
+
+def get_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout in seconds for each webhook request."""
+    return (
+        get_env_float("WEBHOOK_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+        get_env_float("WEBHOOK_TIMEOUT", DEFAULT_READ_TIMEOUT),
+    )
+
+
+def build_session() -> requests.Session:
+    # Sized to the worker limit so no worker waits on, or opens outside
+    # of, the pool. Failed deliveries are not retried here.
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=worker_limit("WEBHOOK_WORKERS", DEFAULT_WORKERS), max_retries=0)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Content-Type": "application/json",
+            "User-Agent": USER_AGENT,
+        }
+    )
+    return session
+
+
+def get_session() -> requests.Session:
+    global SESSION
+
+    with SESSION_LOCK:
+        if SESSION is None:
+            SESSION = build_session()
+
+    return SESSION
+
+
+def signature_headers(data: bytes) -> Dict[str, str]:
+    """
+    HMAC-SHA256 of "<timestamp>.<body>" with WEBHOOK_SECRET, so receivers
+    can check both who sent the payload and that it is not a replay.
+    """
+    secret = os.getenv("WEBHOOK_SECRET", "").strip()
+
+    if not secret:
+        return {}
+
+    timestamp = str(int(time.time()))
+    digest = hmac.new(secret.encode("utf-8"), timestamp.encode("utf-8") + b"." + data, hashlib.sha256)
+
+    return {
+        "X-Webhook-Timestamp": timestamp,
+        "X-Webhook-Signature": f"sha256={digest.hexdigest()}",
+    }
+
+
+def read_json(response: requests.Response) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def post_json(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """POST payload, signed if WEBHOOK_SECRET is set, through the shared session; never raises."""
+    data = json.dumps(payload).encode("utf-8")
+
+    try:
+        response = get_session().post(url, data=data, headers=signature_headers(data), timeout=get_timeout())
+    except requests.RequestException as e:
+        return {
+            "ok": False,
+            "status_code": None,
+            "response_body": str(e),
+            "response_json": None,
+        }
+
+    return {
+        "ok": 200 <= response.status_code < 300,
+        "status_code": response.status_code,
+        "response_body": response.text[:RESPONSE_PREVIEW_CHARS],
+        "response_json": read_json(response),
+    }
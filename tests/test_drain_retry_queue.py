@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.notion_stand_in import NotionStandIn, error, plain_text, start_server
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+WEEK = "2026-W42"
+CLIENTS = ["cascade_cold_chain", "inland_flatbed_logistics", "iron_mile_freight"]
+NOTION_FAILS = "cascade_cold_chain"
+WEBHOOK_FAILS = "iron_mile_freight"
+
+
+class FlakyNotion(NotionStandIn):
+    """Answers the first page create for NOTION_FAILS with a 502."""
+
+    def __init__(self) -> None:
+        super().__init__(rate_limit=0)
+        self.failed = False
+
+    def create_page(self, body: Dict[str, Any]):
+        client_id = plain_text(body.get("properties", {}).get("Client ID", {}).get("rich_text", []))
+
+        if client_id == NOTION_FAILS and not self.failed:
+            self.failed = True
+            return error(502, "internal_server_error", "Bad gateway")
+
+        return super().create_page(body)
+
+
+def start_webhook_receiver(received: List[str]) -> ThreadingHTTPServer:
+    """Webhook receiver that rejects the first delivery for WEBHOOK_FAILS."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            client_id = payload.get("client_id")
+            status = 500 if client_id == WEBHOOK_FAILS and client_id not in received else 200
+            received.append(client_id)
+
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_week(root: Path) -> None:
+    for client_id in CLIENTS:
+        client_dir = root / "output" / WEEK / client_id
+        client_dir.mkdir(parents=True)
+
+        for name in ("recruiting_posts", "social_posts", "safety_reminders", "company_update", "freight_digest", "full_pack"):
+            (client_dir / f"{name}.md").write_text(f"# {name}\n" + "Practical freight content line.\n" * 50, encoding="utf-8")
+
+        (client_dir / "full_pack.pdf").write_bytes(os.urandom(4096))
+        (client_dir / "meta.json").write_text(
+            json.dumps({"client_id": client_id, "company_name": f"{client_id} Co"}),
+            encoding="utf-8",
+        )
+
+
+def run_stage(root: Path, module: str, env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", f"src.{module}"],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_drained_failures_pass_the_health_check(tmp_path: Path) -> None:
+    shutil.copytree(ROOT_DIR / "src", tmp_path / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    write_week(tmp_path)
+
+    notion = FlakyNotion()
+    notion_server = start_server(notion)
+    received: List[str] = []
+    webhook_server = start_webhook_receiver(received)
+
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith(("GOOGLE_", "SMTP_", "PACK_EMAIL", "WEBHOOK_", "NOTION_", "RETRY_"))
+    }
+    env.update(
+        WEEK_KEY=WEEK,
+        NOTION_API_URL=notion.base_url,
+        NOTION_API_KEY="test-key",
+        NOTION_DATABASE_ID=notion.database_id,
+        NOTION_RATE_LIMIT="100",
+        NOTION_HTTP_RETRIES="0",
+        WEBHOOK_URL=f"http://127.0.0.1:{webhook_server.server_address[1]}/hook",
+        RETRY_BASE_SECONDS="0",
+    )
+
+    try:
+        for module in (
+            "validate_content_quality",
+            "package_trucking_outputs",
+            "build_distribution_manifest",
+            "upload_drive_artifacts",
+            "publish_to_notion",
+            "send_webhook_notifications",
+            "send_email_notifications",
+        ):
+            result = run_stage(tmp_path, module, env)
+            assert result.returncode == 0, result.stdout + result.stderr
+
+        manifest = json.loads((tmp_path / "output" / WEEK / "distribution_manifest.json").read_text())
+        assert manifest["notion_publish_failed_client_count"] == 1
+        assert manifest["webhook_failed_client_count"] == 1
+
+        result = run_stage(tmp_path, "drain_retry_queue", env)
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "Retries resolved: 3" in result.stdout
+
+        manifest = json.loads((tmp_path / "output" / WEEK / "distribution_manifest.json").read_text())
+        assert manifest["notion_published_client_count"] == len(CLIENTS)
+        assert manifest["notion_publish_failed_client_count"] == 0
+        assert manifest["webhook_sent_client_count"] == len(CLIENTS)
+        assert manifest["webhook_failed_client_count"] == 0
+
+        for module in ("simulate_failure_retry", "simulate_retry_recovery", "write_run_history", "validate_pipeline_health"):
+            result = run_stage(tmp_path, module, env)
+            assert result.returncode == 0, result.stdout + result.stderr
+
+        assert "PIPELINE HEALTH CHECK PASSED" in result.stdout
+    finally:
+        notion_server.shutdown()
+        webhook_server.shutdown()
@@ -0,0 +1,48 @@
+from typing import Any, Dict
+
+import pytest
+
+from src import publish_to_notion
+from src.notion_stand_in import NotionStandIn, error, start_server
+
+
+WEEK = "2026-W42"
+CLIENT = {"client_id": "cascade_cold_chain", "company_name": "Cascade Cold Chain"}
+
+
+class FailingCreate(NotionStandIn):
+    """Answers the first page create with a 502, after storing the page if stored_first is set."""
+
+    def __init__(self, stored_first: bool) -> None:
+        super().__init__(rate_limit=0)
+        self.stored_first = stored_first
+        self.creates = 0
+
+    def create_page(self, body: Dict[str, Any]):
+        self.creates += 1
+
+        if self.creates > 1:
+            return super().create_page(body)
+
+        if self.stored_first:
+            super().create_page(body)
+
+        return error(502, "internal_server_error", "Bad gateway")
+
+
+@pytest.mark.parametrize("stored_first", [True, False])
+def test_create_after_server_error_leaves_one_page(monkeypatch: pytest.MonkeyPatch, stored_first: bool) -> None:
+    notion = FailingCreate(stored_first)
+    server = start_server(notion)
+
+    monkeypatch.setenv("NOTION_API_URL", notion.base_url)
+    monkeypatch.setenv("NOTION_HTTP_RETRIES", "2")
+    monkeypatch.setattr(publish_to_notion.notion_http, "retry_delay", lambda response, attempt: 0)
+
+    try:
+        page = publish_to_notion.create_notion_page("test-key", notion.database_id, WEEK, dict(CLIENT))
+    finally:
+        server.shutdown()
+
+    assert list(notion.pages) == [page["id"]]
+    assert notion.creates == (1 if stored_first else 2)
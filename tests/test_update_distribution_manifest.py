@@ -0,0 +1,50 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+WEEK = "2026-W42"
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    shutil.copytree(ROOT_DIR / "src", tmp_path / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    (tmp_path / "output" / WEEK).mkdir(parents=True)
+    return tmp_path
+
+
+def run_update(root: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "src.update_distribution_manifest", *args],
+        cwd=root,
+        env={**os.environ, "WEEK_KEY": WEEK},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_missing_update_file_fails_without_traceback(tree: Path) -> None:
+    result = run_update(tree, "--file", str(tree / "missing.csv"))
+
+    assert result.returncode == 1
+    assert "Manifest update failed: Update file does not exist" in result.stdout
+    assert "Traceback" not in result.stderr
+
+
+@pytest.mark.parametrize("header", ["client_id,value", "client_id,field", "id,field,value"])
+def test_update_csv_without_required_header_fails_without_traceback(tree: Path, header: str) -> None:
+    path = tree / "updates.csv"
+    path.write_text(f"{header}\ncascade_cold_chain,notes\n", encoding="utf-8")
+
+    result = run_update(tree, "--file", str(path))
+
+    assert result.returncode == 1
+    assert "Manifest update failed: Update CSV" in result.stdout
+    assert "expected a client_id,field,value header" in result.stdout
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,67 @@
+import contextlib
+import io
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from src import upload_drive_artifacts
+from src.benchmark_drive_upload import build_clients, build_service_account_json, build_week_dir
+from src.drive_stand_in import FOLDER_MIME_TYPE, DriveStandIn, start_server
+
+
+@pytest.fixture
+def drive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    drive = DriveStandIn(tmp_path / "drive")
+    server = start_server(drive)
+
+    monkeypatch.setenv("GOOGLE_API_ENDPOINT", drive.base_url)
+    monkeypatch.setenv("GOOGLE_SERVICE_ACCOUNT_JSON", build_service_account_json(f"{drive.base_url}/token"))
+    monkeypatch.setenv("DRIVE_UPLOAD_CHUNK_MB", "1")
+
+    yield drive
+    server.shutdown()
+
+
+def upload(clients: List[Dict[str, Any]], week_dir: Path, root_id: str, folder_cache: Dict[str, str]) -> None:
+    for client in clients:
+        client["delivery_status"] = "ready_for_upload"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        upload_drive_artifacts.upload_clients(
+            clients,
+            week_dir,
+            True,
+            root_drive_folder_id=root_id,
+            folder_cache=folder_cache,
+            workers=2,
+        )
+
+
+@pytest.mark.parametrize("trashed", ["week", "client"])
+def test_trashed_cached_folder_is_replaced_on_the_next_run(
+    drive: DriveStandIn,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    trashed: str,
+) -> None:
+    week_dir = build_week_dir(tmp_path / "output", 2, 0.1)
+    root = drive.create_file({"name": "root", "mimeType": FOLDER_MIME_TYPE})
+    clients = build_clients(week_dir)
+    folder_cache: Dict[str, str] = {}
+
+    upload(clients, week_dir, root["id"], folder_cache)
+
+    stale_id = clients[0][f"drive_{trashed}_folder_id"]
+    drive.trash_file(stale_id)
+
+    # A new run starts with the saved folder cache but nothing checked yet.
+    monkeypatch.setattr(upload_drive_artifacts, "CHECKED_FOLDER_IDS", set())
+    upload(clients, week_dir, root["id"], folder_cache)
+
+    assert [client["delivery_status"] for client in clients] == ["uploaded", "uploaded"]
+    assert stale_id not in folder_cache.values()
+
+    for client in clients:
+        for kind in ("week_folder", "client_folder", "zip_file", "pdf_file", "markdown_file"):
+            assert not drive.get_file(client[f"drive_{kind}_id"])["trashed"]